@@ -21,35 +21,88 @@ Dependencies:
 
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 from openai import OpenAI
+from requests.adapters import HTTPAdapter
 
 # Import custom modules for parsing, AI prompting, and web scraping
 from parsing import parse_query, split_options_deterministic
-from prompting import normalize_options_via_llm
+from prompting import get_client, normalize_options_via_llm_sync
 from effective_scraper import scrape_effective_sites
 
 # Application configuration constants
 APP_TITLE = "AI System for ATE Equipment"
-API_KEY = API_KEY = ""
-MODEL_NAME = "gpt-4"  # OpenAI model to use for AI processing
+MODEL_NAME = "gpt-4o"  # OpenAI model to use for AI processing (must support structured outputs)
 TEMPERATURE = 0.0  # Temperature setting for AI responses (0.0 = deterministic)
+CATEGORY_MODEL = "gpt-4o-mini"  # Cheaper model used when an option still needs a category
+OPTION_CATEGORIES = ("Connectivity", "Software", "Calibration", "Power", "Display", "Storage", "Communication", "General")
+_VALID_CATEGORIES = frozenset(OPTION_CATEGORIES)  # O(1) membership checks for model answers
+MAX_CONCURRENT_REQUESTS = 10  # Upper bound on simultaneous OpenAI calls per analysis
+OPTION_CACHE_TTL = 24 * 60 * 60  # Seconds to keep option explanations cached
+OPTION_STORE_SIZE = 512  # Maximum number of brand-wide explanations in the shared option store
+# Option codes that mean the same for every model of a brand family (calibration
+# certificates, manual languages, rack-mount kits); all other codes are model-specific
+BRAND_WIDE_OPTION_PREFIXES = ("UK6", "A6J", "1A7", "ABA", "ABJ", "1CM", "1CN", "1CP")
 
 # Configure Streamlit page settings (must be called before any other Streamlit commands)
 st.set_page_config(page_title=APP_TITLE, page_icon="🧭", layout="wide")
 
 
+@st.cache_resource
+def _api_key() -> str:
+	"""
+	Load the OpenAI API key once per process.
+	
+	The key is read from Streamlit secrets (.streamlit/secrets.toml) and falls
+	back to the OPENAI_API_KEY environment variable, as set in render.yaml.
+	
+	Returns:
+		str: The API key, or "" if none is configured
+	"""
+	try:
+		key = st.secrets.get("OPENAI_API_KEY")
+	except FileNotFoundError:
+		key = None  # No secrets file configured
+	return key or os.environ.get("OPENAI_API_KEY", "")
+
+
 def get_openai_client() -> OpenAI:
 	"""
 	Initialize and return an OpenAI client instance.
 	
+	The client comes from prompting.get_client, which creates it once per
+	process, so its underlying HTTP connection pool is shared across reruns,
+	sessions and the prompting module.
+	
 	Returns:
 		OpenAI: Configured OpenAI client or None if API key is missing
 	"""
-	if not API_KEY:
+	api_key = _api_key()
+	if not api_key:
 		return None
-	return OpenAI(api_key=API_KEY)
+	return get_client(api_key)
+
+
+@st.cache_resource
+def _http_adapter() -> HTTPAdapter:
+	"""
+	Create the transport adapter shared by all market data scrapes.
+	
+	Keep-alive connections are pooled per host, so repeated requests to the
+	same sites skip the TCP and TLS handshakes. Only the adapter is shared,
+	since its connection pools are thread-safe; each scrape mounts it on its
+	own requests.Session, keeping headers and cookies apart between users.
+	
+	Returns:
+		HTTPAdapter: Adapter with pooled keep-alive connections
+	"""
+	return HTTPAdapter(pool_connections=10, pool_maxsize=20)
 
 
 def render_message(role: str, content: str):
@@ -66,6 +119,7 @@ def render_message(role: str, content: str):
 		st.chat_message("assistant").markdown(content)
 
 
+@st.cache_data
 def _get_hardcoded_data():
 	"""
 	Return hardcoded ATE equipment database for demonstration purposes.
@@ -100,16 +154,58 @@ def _get_hardcoded_data():
 	return header, data_lines
 
 
-def _extract_from_selected_line(header: str, line: str):
+@st.cache_data
+def _column_index(header: str) -> dict[str, int]:
 	"""
-	Extract equipment brand, model, and options from a tab-separated data line.
+	Map each column name of a tab-separated header to its position.
+	
+	Args:
+		header (str): Tab-separated column headers
+		
+	Returns:
+		dict[str, int]: Column name to index mapping
+	"""
+	return {name: i for i, name in enumerate(header.split("\t"))}
+
+
+@st.cache_data
+def _split_rows(lines: tuple[str, ...]) -> list[tuple[str, ...]]:
+	"""
+	Split every tab-separated data row into its fields once.
+	
+	Args:
+		lines (tuple[str, ...]): Tab-separated data rows (a tuple so it can be hashed)
+		
+	Returns:
+		list[tuple[str, ...]]: Fields of each row, in the same order as the input
+	"""
+	return [tuple(line.split("\t")) for line in lines]
+
+
+@st.cache_data
+def _build_display_options(rows: tuple[tuple[str, ...], ...]) -> list[str]:
+	"""
+	Build the selection labels for the equipment database entries.
+	
+	Args:
+		rows (tuple[tuple[str, ...], ...]): Pre-split data rows
+		
+	Returns:
+		list[str]: One label per row in the format "📋 [Model] [Brand] - [Contact Name]"
+	"""
+	return [f"📋 {row[7]} {row[8]} - {row[2]}" for row in rows]
+
+
+def _extract_from_selected_row(header: str, parts: tuple[str, ...]):
+	"""
+	Extract equipment brand, model, and options from a pre-split data row.
 	
 	This function parses a single equipment record and extracts the key information
 	needed for analysis: brand name, model number, and available options.
 	
 	Args:
 		header (str): Tab-separated column headers
-		line (str): Tab-separated data line containing equipment information
+		parts (tuple[str, ...]): Fields of the data line containing equipment information
 		
 	Returns:
 		tuple: (brand, model, options)
@@ -117,12 +213,8 @@ def _extract_from_selected_line(header: str, line: str):
 			- model (str): Equipment model number
 			- options (str): Available options (slash-separated)
 	"""
-	# Split header to create column name to index mapping
-	head_cols = header.split("\t")
-	col_to_idx = {name: i for i, name in enumerate(head_cols)}
-	
-	# Split the data line into individual fields
-	parts = line.split("\t")
+	# Look up the (cached) column name to index mapping
+	col_to_idx = _column_index(header)
 	
 	# Safely get column indices for key fields
 	idx_model = col_to_idx.get("eqModel")
@@ -137,6 +229,549 @@ def _extract_from_selected_line(header: str, line: str):
 	return brand, model, options
 
 
+def _option_request_body(brand: str, model: str, opt: str, llm_model: str) -> dict:
+	"""
+	Build the chat completion request body that explains and categorizes one option.
+
+	Args:
+		brand (str): Equipment manufacturer name
+		model (str): Equipment model number, or "" for a code that means the
+			same on every model of the brand
+		opt (str): Option code to explain
+		llm_model (str): OpenAI model to use
+
+	Returns:
+		dict: Keyword arguments for chat.completions.create
+	"""
+	# Create detailed prompt for option explanation and categorization
+	if model:
+		subject = f"Explain briefly what option '{opt}' means for {brand} {model}. "
+	else:
+		subject = (
+			f"Explain briefly what option '{opt}' means on {brand} test equipment. "
+			"The code means the same on every model of the brand, so do not refer to a specific model. "
+		)
+	opt_prompt = subject + (
+		"Include what it adds or changes, typical functionality, and any compatibility considerations. "
+		"Return JSON with two fields: 'explanation' (3-5 concise sentences in simple terms) and "
+		f"'category' (one of: {', '.join(OPTION_CATEGORIES)})."
+	)
+	return {
+		"model": llm_model,
+		"temperature": float(TEMPERATURE),
+		"response_format": {"type": "json_object"},
+		"messages": [
+			{"role": "system", "content": "You are a helpful expert explaining and categorizing test equipment options in simple terms. Respond only with JSON."},
+			{"role": "user", "content": opt_prompt},
+		],
+	}
+
+
+def _parse_option_result(content: str) -> dict:
+	"""
+	Parse the JSON answer for one option into an explanation and a validated category.
+	
+	Args:
+		content (str): Raw message content returned by the model
+
+	Returns:
+		dict: {"explanation": str, "category": str or None}; the category is None
+			when the model did not return one of OPTION_CATEGORIES
+	"""
+	data = json.loads(content or "{}")
+	explanation = str(data.get("explanation") or "No explanation available.")
+	# Validate the category is one of our predefined ones
+	api_category = str(data.get("category", "")).strip()
+	category = api_category if api_category in _VALID_CATEGORIES else None
+	return {"explanation": explanation, "category": category}
+
+
+@st.cache_data(show_spinner=False, ttl=OPTION_CACHE_TTL)
+def _categorize_option(opt: str, explanation: str) -> str:
+	"""
+	Assign an option to one of OPTION_CATEGORIES using the cheaper CATEGORY_MODEL.
+	
+	Only used when the combined explain+categorize answer lacks a valid
+	category. The answer is constrained to the category list with a
+	structured output enum. Results are cached per (option, explanation);
+	errors are raised so that failures are never cached.
+	
+	Args:
+		opt (str): Option code to categorize
+		explanation (str): Previously generated explanation of the option
+		
+	Returns:
+		str: Category name
+	"""
+	client = get_openai_client()
+	category_completion = client.chat.completions.create(
+		model=CATEGORY_MODEL,
+		temperature=0.0,
+		response_format={
+			"type": "json_schema",
+			"json_schema": {
+				"name": "option_category",
+				"strict": True,
+				"schema": {
+					"type": "object",
+					"properties": {"category": {"type": "string", "enum": list(OPTION_CATEGORIES)}},
+					"required": ["category"],
+					"additionalProperties": False
+				}
+			}
+		},
+		messages=[
+			{"role": "system", "content": "You are a helpful expert that categorizes test equipment options."},
+			{"role": "user", "content": f"Categorize option '{opt}' based on this description: '{explanation}'"},
+		],
+	)
+	return json.loads(category_completion.choices[0].message.content)["category"]
+
+
+@st.cache_data(show_spinner=False, ttl=OPTION_CACHE_TTL)
+def _explain_option(brand: str, model: str, opt: str, llm_model: str) -> dict:
+	"""
+	Generate a short AI explanation and category for a single equipment option.
+
+	The explanation and the category are requested in one JSON-mode chat
+	completion. Results are cached per (brand, model, option, model name);
+	errors are raised rather than returned so that failures are never cached.
+	The category is left as None when the answer lacks a valid one; the
+	caller categorizes it outside the cache, so a failed categorization is
+	retried on the next analysis instead of being cached with the result.
+
+	Args:
+		brand (str): Equipment manufacturer name
+		model (str): Equipment model number
+		opt (str): Option code to explain
+		llm_model (str): OpenAI model to use
+
+	Returns:
+		dict: {"explanation": str, "category": str or None}
+	"""
+	client = get_openai_client()
+	# Call OpenAI API once for both explanation and category
+	opt_completion = client.chat.completions.create(**_option_request_body(brand, model, opt, llm_model))
+	return _parse_option_result(opt_completion.choices[0].message.content)
+
+
+@st.cache_resource
+def _opt_cache() -> tuple[OrderedDict, threading.Lock]:
+	"""
+	Return the process-wide store of brand-wide option explanations.
+	
+	Only codes in BRAND_WIDE_OPTION_PREFIXES are stored here, keyed by brand
+	family, so spellings like "Agilent" and "Agilent HP Keysight" share them;
+	model-specific explanations are cached by _explain_option alone. Entries expire after OPTION_CACHE_TTL seconds, and the least recently used
+	ones are dropped beyond OPTION_STORE_SIZE entries. The lock guards the store
+	against concurrent sessions.
+	
+	Returns:
+		tuple[OrderedDict, threading.Lock]: Mapping of option key to
+			(expiry time, {"explanation", "category"}) and its lock
+	"""
+	return OrderedDict(), threading.Lock()
+
+
+def _shared_option_key(brand: str, opt: str) -> tuple | None:
+	"""
+	Build the option store key of a brand-wide option code.
+	
+	Option codes usually mean different things on different models; only
+	codes in BRAND_WIDE_OPTION_PREFIXES are shared between the models of a
+	brand family.
+	
+	Args:
+		brand (str): Equipment manufacturer name
+		opt (str): Option code
+		
+	Returns:
+		tuple: Store key, or None for a model-specific code
+	"""
+	if opt.upper().startswith(BRAND_WIDE_OPTION_PREFIXES):
+		return (_brand_family(brand), opt)
+	return None
+
+
+def _opt_cache_get(key: tuple) -> dict | None:
+	"""
+	Look up an unexpired explanation in the option store.
+	
+	Args:
+		key (tuple): Key built by _shared_option_key
+		
+	Returns:
+		dict: {"explanation", "category"}, or None if not stored
+	"""
+	store, lock = _opt_cache()
+	with lock:
+		entry = store.get(key)
+		if entry is None:
+			return None
+		expires, result = entry
+		if expires < time.monotonic():
+			del store[key]
+			return None
+		store.move_to_end(key)
+		return result
+
+
+def _opt_cache_put(key: tuple, result: dict):
+	"""
+	Store an explanation, dropping the least recently used entries when full.
+	
+	Args:
+		key (tuple): Key built by _shared_option_key
+		result (dict): {"explanation", "category"}
+	"""
+	store, lock = _opt_cache()
+	with lock:
+		store[key] = (time.monotonic() + OPTION_CACHE_TTL, result)
+		store.move_to_end(key)
+		while len(store) > OPTION_STORE_SIZE:
+			store.popitem(last=False)
+
+
+def _brand_family(brand: str) -> str:
+	"""
+	Reduce a brand name to the key shared by its variants (e.g. "Agilent HP Keysight" -> "agilent").
+	
+	Args:
+		brand (str): Equipment manufacturer name
+		
+	Returns:
+		str: Lower-cased first word of the brand, or "" for an empty brand
+	"""
+	words = brand.split()
+	return words[0].lower() if words else ""
+
+
+def _explain_all(brand: str, model: str, options: list[str]) -> dict:
+	"""
+	Explain and categorize every option of the selected equipment.
+
+	Brand-wide codes are explained without naming the model and reused
+	across the brand family from the process-wide option store; the rest are
+	explained with live requests running concurrently. Previously explained
+	options are also served from the Streamlit data cache.
+
+	Args:
+		brand (str): Equipment manufacturer name
+		model (str): Equipment model number
+		options (list[str]): Option codes to explain
+
+	Returns:
+		dict: Mapping of option code to {"explanation", "category"}
+	"""
+	unique_options = list(dict.fromkeys(options))
+
+	if get_openai_client() is None:
+		# Fallback explanation if no AI client available
+		return {
+			opt: {
+				"explanation": f"Option '{opt}' adds specific functionality to the {brand} {model}.",
+				"category": "General"
+			}
+			for opt in unique_options
+		}
+
+	# Reuse stored explanations of brand-wide codes from the same brand family
+	keys = {opt: _shared_option_key(brand, opt) for opt in unique_options}
+	results = {}
+	for opt, key in keys.items():
+		stored = _opt_cache_get(key) if key is not None else None
+		if stored is not None:
+			results[opt] = stored
+	missing = [opt for opt in unique_options if opt not in results]
+
+	def explain(opt: str):
+		try:
+			# Brand-wide codes are explained for the brand, not this model
+			result = _explain_option(brand, "" if keys[opt] else model, opt, MODEL_NAME)
+		except Exception as e:
+			return e
+		if result["category"] is None:
+			try:
+				result["category"] = _categorize_option(opt, result["explanation"])
+			except Exception:
+				# Fallback to default category for this analysis only
+				return {**result, "category": "General"}, False
+		return result, True
+
+	# Explain remaining options concurrently (API-bound, not CPU-bound); worker
+	# threads share the script context so they can use the Streamlit cache
+	fresh = {}
+	if missing:
+		with ThreadPoolExecutor(
+			max_workers=MAX_CONCURRENT_REQUESTS,
+			initializer=add_script_run_ctx,
+			initargs=(None, get_script_run_ctx()),
+		) as executor:
+			for opt, result in zip(missing, executor.map(explain, missing)):
+				if isinstance(result, Exception):
+					# Handle errors in option explanation generation (not cached)
+					results[opt] = {
+						"explanation": f"Could not get details for option '{opt}': {result}",
+						"category": "General"
+					}
+				else:
+					results[opt], complete = result
+					if complete:
+						fresh[opt] = results[opt]
+
+	# Share new brand-wide explanations; fallback categories are left out so they are retried
+	for opt, result in fresh.items():
+		if keys[opt] is not None:
+			_opt_cache_put(keys[opt], result)
+	return results
+
+
+def _explain_payload_options(payload: dict) -> tuple[dict, dict]:
+	"""
+	Generate detailed explanations and categories for the parsed equipment options.
+	
+	Args:
+		payload (dict): Parsed equipment data
+		
+	Returns:
+		tuple[dict, dict]: Explanation and category of each option
+	"""
+	normalized = payload.get("normalized", {})
+	options_list = normalized.get("options", []) or []
+	if not options_list:
+		return {}, {}
+
+	# Explain and categorize all options with concurrent live calls
+	results = _explain_all(normalized.get("brand", ""), normalized.get("model", ""), options_list)
+	option_explanations = {opt: result["explanation"] for opt, result in results.items()}
+	option_categories = {opt: result["category"] for opt, result in results.items()}
+	return option_explanations, option_categories
+
+
+@st.fragment
+def _analysis_fragment(header: str, parts: tuple[str, ...], do_market_extraction: bool):
+	"""
+	Display the selected equipment and run or show its analysis.
+	
+	Runs as a Streamlit fragment, so clicking Analyze reruns only this
+	function instead of the whole script.
+	
+	Args:
+		header (str): Tab-separated column headers
+		parts (tuple[str, ...]): Fields of the selected equipment row
+		do_market_extraction (bool): Whether to scrape market data
+	"""
+	# Display selected equipment information
+	st.markdown("---")
+	st.subheader("🎯 Selected Equipment")
+
+	# Show equipment details in two columns
+	col1, col2 = st.columns(2)
+	with col1:
+		st.markdown(f"**Quote ID:** {parts[0]}")
+		st.markdown(f"**Contact:** {parts[2]}")
+		st.markdown(f"**Brand:** {parts[8]}")
+		st.markdown(f"**Model:** {parts[7]}")
+	with col2:
+		st.markdown(f"**Created:** {parts[1]}")
+		st.markdown(f"**Record ID:** {parts[4]}")
+		st.markdown(f"**Options:** {parts[9]}")
+
+	# Add analysis button
+	st.markdown("---")
+	check_clicked = st.button("🔍 Analyze", type="primary", use_container_width=True)
+
+	# Check if we have cached analysis for this equipment to avoid re-processing
+	brand_for_session = parts[8].strip()
+	model_for_session = parts[7].strip()
+	analysis_key_current = f"{brand_for_session}|{model_for_session}"
+	cached_analysis = st.session_state.get("analysis_key") == analysis_key_current
+
+	# Perform analysis if button clicked or if we have cached results
+	if check_clicked or cached_analysis:
+		# Show comprehensive loading state with non-technical explanations
+		if check_clicked:
+			st.markdown("---")
+			st.subheader("🔍 Analyzing Your Equipment")
+			
+			# Display progress in one status container whose label follows the current step
+			status = st.status("🚀 Parsing equipment data...", expanded=True)
+
+			# Extract brand/model/options from selected equipment line
+			brand, model, options_str = _extract_from_selected_row(header, parts)
+			brand_parsed = brand.strip()
+			model_parsed = model.strip()
+
+			# Parse and clean equipment options
+			if options_str:
+				# Split options by '/' and clean each option
+				raw_options_list = [opt.strip() for opt in options_str.split('/') if opt.strip()]
+				# Filter out any options that might be brand/model names
+				filtered_options = []
+				for opt in raw_options_list:
+					# Skip if it looks like a brand or model name
+					if opt.lower() not in [brand_parsed.lower(), model_parsed.lower()] and len(opt) > 0:
+						filtered_options.append(opt)
+				raw_options = '/'.join(filtered_options)
+			else:
+				raw_options = ""
+
+			# AI-powered equipment analysis using OpenAI
+			try:
+				client = get_openai_client()
+				# Create input string for AI processing
+				llm_input = f"{brand_parsed} {model_parsed} {raw_options}" if raw_options else f"{brand_parsed} {model_parsed}"
+				
+				if client is not None:
+					# Use AI to normalize and parse equipment options
+					payload = normalize_options_via_llm_sync(
+						client,
+						llm_input,
+						MODEL_NAME,
+						float(TEMPERATURE),
+					)
+				else:
+					# Fallback to deterministic parsing if no AI client
+					payload = {
+						"normalized": {
+							"brand": brand_parsed,
+							"model": model_parsed,
+							"options": split_options_deterministic(raw_options)
+						},
+						"results": []
+					}
+				# Ensure brand and model are set correctly
+				payload["normalized"]["brand"] = brand_parsed
+				payload["normalized"]["model"] = model_parsed
+			except Exception as e:
+				# Handle AI processing errors gracefully
+				payload = {
+					"normalized": {
+						"brand": brand_parsed,
+						"model": model_parsed,
+						"options": []
+					},
+					"results": []
+				}
+
+			status.write("✅ Parsing equipment data")
+
+			# Step 2: Generate AI explanations for each equipment option
+			status.update(label="Explaining options...")
+
+			# Explain the options while market data is scraped in the background, so
+			# the scraping network I/O overlaps the option explanation requests
+			scraping_results = None
+			if do_market_extraction:
+				with ThreadPoolExecutor(max_workers=1) as scraping_executor:
+					# Use the effective scraper to find equipment listings and prices
+					scraping_future = scraping_executor.submit(
+						scrape_effective_sites,
+						brand_parsed,
+						model_parsed,
+						payload["normalized"]["options"],
+						adapter=_http_adapter()
+					)
+					option_explanations, option_categories = _explain_payload_options(payload)
+
+					# Web scraping (usually finished by now)
+					try:
+						scraping_results = scraping_future.result()
+					except Exception as e:
+						# Handle scraping errors gracefully
+						scraping_results = None
+			else:
+				st.info("Market data extraction skipped.")
+				option_explanations, option_categories = _explain_payload_options(payload)
+
+			status.write("✅ Explaining options")
+
+			# Step 3: Searching market data
+			# status.update(label="Searching market data...")
+			# status.write("✅ Searching market data")  # Commented out in UI but functionality exists
+
+			# Mark the analysis as finished
+			status.update(label="Analysis complete", state="complete")
+
+			# Store analysis results in session state for caching and display
+			st.session_state["analysis_key"] = f"{brand_parsed}|{model_parsed}"
+			st.session_state["analysis_payload"] = payload
+			# Only store scraping results if market extraction was performed
+			st.session_state["analysis_scraping"] = scraping_results if do_market_extraction else None
+			st.session_state["option_explanations"] = option_explanations
+			st.session_state["option_categories"] = option_categories
+
+		# Display complete analysis results (only after everything is ready)
+		if st.session_state.get("analysis_key") == analysis_key_current:
+			# Retrieve cached analysis results from session state
+			payload = st.session_state.get("analysis_payload")
+			scraping_results = st.session_state.get("analysis_scraping")
+			option_explanations = st.session_state.get("option_explanations", {})
+			option_categories = st.session_state.get("option_categories", {})
+
+			# Display results section
+			st.markdown("---")
+			st.subheader("📋 Complete Analysis Results")
+
+			# Show raw parsing results in JSON format
+			st.markdown("**✅ Equipment Analysis:**")
+			st.code(json.dumps(payload, indent=2), language="json")
+
+			# Options explorer with tabular display
+			options_list = payload.get("normalized", {}).get("options", []) or []
+			st.markdown("**🔧 Options Explorer:**")
+			
+			if not options_list:
+				st.info("No options found for this equipment model.")
+			else:
+				# Create table data with AI-determined categories for each option
+				table_data = []
+				for i, opt in enumerate(options_list):
+					explanation = option_explanations.get(opt, "No description available.")
+					
+					category = option_categories.get(opt, "General")
+
+					# Add option data to table
+					table_data.append({
+						"Row": i + 1,
+						"Option Code": opt,
+						"Category": category,
+						"Description": explanation
+					})
+
+				# Display the options as an interactive (sortable, virtualized) table
+				st.markdown("**All available options for this equipment:**")
+				st.dataframe(
+					pd.DataFrame(table_data),
+					use_container_width=True,
+					hide_index=True,
+					column_config={"Description": st.column_config.TextColumn(width="large")}
+				)
+
+			# Display market data results (if available)
+			if do_market_extraction:
+				# Note: Market data display is currently commented out in the UI
+				# but the data is still collected and could be displayed
+				scraping_json = {"web_scraping_results": []}
+				if scraping_results and "search_results" in scraping_results and scraping_results["search_results"]:
+					# Process and format market data results
+					for result in scraping_results["search_results"]:
+						scraping_json["web_scraping_results"].append({
+							"brand": result.get('brand', 'N/A'),
+							"model": result.get('model', 'N/A'),
+							"price": result.get('price', 'Price not available'),
+							"vendor": result.get('vendor', 'Vendor not available'),
+							"web_url": result.get('web_url', 'URL not available'),
+							"qty_available": result.get('qty_available', 'Quantity not available'),
+							"source": result.get('source', 'Source not available')
+					})
+				# Note: Market data JSON display is commented out
+				# st.code(json.dumps(scraping_json, indent=2), language="json")
+	else:
+		# Show message when no equipment is selected
+		st.info("👆 Please select an equipment entry from the dropdown above.")
+
+
 def main():
 	"""
 	Main Streamlit application function.
@@ -147,9 +782,13 @@ def main():
 	# Display page title and description
 	st.title(APP_TITLE)
 	st.caption("Select equipment from the table below and click Analyze to see all the details")
+	if not _api_key():
+		st.warning("OPENAI_API_KEY is not configured, so the analysis falls back to basic parsing without AI explanations.")
 
 	# Load the hardcoded equipment dataset
 	header, all_data_lines = _get_hardcoded_data()
+	# Split every row once; all later field access uses these tuples
+	rows = _split_rows(tuple(all_data_lines))
 
 	# Create equipment selection interface
 	if header and all_data_lines:
@@ -162,405 +801,26 @@ def main():
 		# Create equipment selection interface
 		st.markdown("**Select an equipment entry:**")
 
-		# Create a list of display names for the radio buttons
+		# Create a list of display names for the selectbox
 		# Format: "📋 [Model] [Brand] - [Contact Name]"
-		display_options = [f"📋 {line.split('\t')[7]} {line.split('\t')[8]} - {line.split('\t')[2]}" for line in all_data_lines]
-		
-		# Add a "Select equipment" placeholder at the beginning
-		display_options.insert(0, "— Select equipment —")
+		display_options = _build_display_options(tuple(rows))
 		
-		# Create radio button selection interface
-		selected_display_option = st.radio(
+		# Create selectbox over row indices; -1 is the "Select equipment" placeholder,
+		# so the selected row index is returned directly without a reverse lookup
+		selected_index = st.selectbox(
 			"Choose equipment:",
-			options=display_options,
+			options=list(range(-1, len(rows))),
+			format_func=lambda i: "— Select equipment —" if i < 0 else display_options[i],
 			index=0 # Default to the placeholder
 		)
 		
 		# Market extraction is always enabled (previously had user toggle)
 		do_market_extraction = True # Always perform market extraction now
 
-		# Determine the selected equipment index based on the display option
-		if selected_display_option == "— Select equipment —":
-			selected_index = -1  # No equipment selected
-		else:
-			# Find the original index of the selected item
-			# Subtract 1 because of the placeholder at index 0
-			selected_index = display_options.index(selected_display_option) - 1
-			
 		# Process selected equipment if one is chosen
 		if selected_index != -1:
-			# Get the selected equipment data
-			selected_line = all_data_lines[selected_index]
-			parts = selected_line.split("\t")
-
-			# Display selected equipment information
-			st.markdown("---")
-			st.subheader("🎯 Selected Equipment")
-
-			# Show equipment details in two columns
-			col1, col2 = st.columns(2)
-			with col1:
-				st.markdown(f"**Quote ID:** {parts[0]}")
-				st.markdown(f"**Contact:** {parts[2]}")
-				st.markdown(f"**Brand:** {parts[8]}")
-				st.markdown(f"**Model:** {parts[7]}")
-			with col2:
-				st.markdown(f"**Created:** {parts[1]}")
-				st.markdown(f"**Record ID:** {parts[4]}")
-				st.markdown(f"**Options:** {parts[9]}")
-
-			# Add analysis button
-			st.markdown("---")
-			check_clicked = st.button("🔍 Analyze", type="primary", use_container_width=True)
-
-			# Check if we have cached analysis for this equipment to avoid re-processing
-			brand_for_session = parts[8].strip()
-			model_for_session = parts[7].strip()
-			analysis_key_current = f"{brand_for_session}|{model_for_session}"
-			cached_analysis = st.session_state.get("analysis_key") == analysis_key_current
-
-			# Perform analysis if button clicked or if we have cached results
-			if check_clicked or cached_analysis:
-				# Show comprehensive loading state with non-technical explanations
-				if check_clicked:
-					st.markdown("---")
-					st.subheader("🔍 Analyzing Your Equipment")
-					
-					# Display initial progress message
-					st.info("🚀 I've started working. Please wait a bit for results...")
-
-					# Add CSS for animated loading spinners
-					st.markdown("""
-					<style>
-					@keyframes spin {
-						0% { transform: rotate(0deg); }
-						100% { transform: rotate(360deg); }
-					}
-					.spinning {
-						animation: spin 1s linear infinite;
-						display: inline-block;
-					}
-					</style>
-					""", unsafe_allow_html=True)
-
-					# Display first progress step: Parsing equipment data
-					col1, col2 = st.columns([0.1, 0.9])
-					with col1:
-						# Show animated spinner
-						st.markdown(
-							"""
-							<style>
-							.spinner {
-							  border: 4px solid #f3f3f3; /* Light gray */
-							  border-top: 4px solid #3498db; /* Blue */
-							  border-radius: 50%;
-							  width: 22px;
-							  height: 22px;
-							  animation: spin 1s linear infinite;
-							  margin: auto;
-							}
-							@keyframes spin {
-							  0% { transform: rotate(0deg); }
-							  100% { transform: rotate(360deg); }
-							}
-							</style>
-							<div class="spinner"></div>
-							""",
-							unsafe_allow_html=True
-						)
-					with col2:
-						st.write("**Parsing equipment data...**")
-
-					# Extract brand/model/options from selected equipment line
-					brand, model, options_str = _extract_from_selected_line(header, selected_line)
-					brand_parsed = brand.strip()
-					model_parsed = model.strip()
-
-					# Parse and clean equipment options
-					if options_str:
-						# Split options by '/' and clean each option
-						raw_options_list = [opt.strip() for opt in options_str.split('/') if opt.strip()]
-						# Filter out any options that might be brand/model names
-						filtered_options = []
-						for opt in raw_options_list:
-							# Skip if it looks like a brand or model name
-							if opt.lower() not in [brand_parsed.lower(), model_parsed.lower()] and len(opt) > 0:
-								filtered_options.append(opt)
-						raw_options = '/'.join(filtered_options)
-					else:
-						raw_options = ""
-
-					# AI-powered equipment analysis using OpenAI
-					try:
-						client = get_openai_client()
-						# Create input string for AI processing
-						llm_input = f"{brand_parsed} {model_parsed} {raw_options}" if raw_options else f"{brand_parsed} {model_parsed}"
-						
-						if client is not None:
-							# Use AI to normalize and parse equipment options
-							payload = normalize_options_via_llm(
-								client,
-								llm_input,
-								MODEL_NAME,
-								float(TEMPERATURE),
-							)
-						else:
-							# Fallback to deterministic parsing if no AI client
-							payload = {
-								"normalized": {
-									"brand": brand_parsed,
-									"model": model_parsed,
-									"options": split_options_deterministic(raw_options)
-								},
-								"results": []
-							}
-						# Ensure brand and model are set correctly
-						payload["normalized"]["brand"] = brand_parsed
-						payload["normalized"]["model"] = model_parsed
-					except Exception as e:
-						# Handle AI processing errors gracefully
-						payload = {
-							"normalized": {
-								"brand": brand_parsed,
-								"model": model_parsed,
-								"options": []
-							},
-							"results": []
-						}
-
-					# Step 2: Generate AI explanations for each equipment option
-					col1, col2 = st.columns([0.1, 0.9])
-					with col1:
-						# Show animated spinner for options explanation
-						st.markdown(
-							"""
-							<style>
-							.spinner {
-							  border: 4px solid #f3f3f3; /* Light gray */
-							  border-top: 4px solid #3498db; /* Blue */
-							  border-radius: 50%;
-							  width: 22px;
-							  height: 22px;
-							  animation: spin 1s linear infinite;
-							  margin: auto;
-							}
-							@keyframes spin {
-							  0% { transform: rotate(0deg); }
-							  100% { transform: rotate(360deg); }
-							}
-							</style>
-							<div class="spinner"></div>
-							""",
-							unsafe_allow_html=True
-						)
-					with col2:
-						st.write("**Explaining options...**")
-
-					# Generate detailed explanations for each equipment option using AI
-					options_list = payload.get("normalized", {}).get("options", []) or []
-					option_explanations = {}
-					client_for_opts = get_openai_client() # Reuse OpenAI client for option explanations
-					
-					if options_list:
-						brand_for_opts = payload.get("normalized", {}).get("brand", "")
-						model_for_opts = payload.get("normalized", {}).get("model", "")
-						
-						# Generate explanation for each option
-						for opt in options_list:
-							try:
-								if client_for_opts is not None:
-									# Create detailed prompt for option explanation
-									opt_prompt = (
-										f"Explain briefly what option '{opt}' means for {brand_for_opts} {model_for_opts}. "
-										"Include what it adds or changes, typical functionality, and any compatibility considerations. "
-										"Answer in 3-5 concise sentences in simple terms."
-									)
-									# Call OpenAI API for option explanation
-									opt_completion = client_for_opts.chat.completions.create(
-										model=MODEL_NAME,
-										temperature=float(TEMPERATURE),
-										messages=[
-											{"role": "system", "content": "You are a helpful expert explaining test equipment options in simple terms."},
-											{"role": "user", "content": opt_prompt},
-										],
-									)
-									option_explanations[opt] = opt_completion.choices[0].message.content or "No explanation available."
-								else:
-									# Fallback explanation if no AI client available
-									option_explanations[opt] = f"Option '{opt}' adds specific functionality to the {brand_for_opts} {model_for_opts}."
-							except Exception as e:
-								# Handle errors in option explanation generation
-								option_explanations[opt] = f"Could not get details for option '{opt}': {e}"
-
-					# Step 3: Searching market data
-					# col1, col2 = st.columns([0.05, 0.95])
-					# with col1:
-					# 	st.markdown(
-					# 		"""
-					# 		<style>
-					# 		.spinner {
-					# 		  border: 4px solid #f3f3f3; /* Light gray */
-					# 		  border-top: 4px solid #3498db; /* Blue */
-					# 		  border-radius: 50%;
-					# 		  width: 22px;
-					# 		  height: 22px;
-					# 		  animation: spin 1s linear infinite;
-					# 		  margin: auto;
-					# 		}
-					# 		@keyframes spin {
-					# 		  0% { transform: rotate(0deg); }
-					# 		  100% { transform: rotate(360deg); }
-					# 		}
-					# 		</style>
-					# 		<div class="spinner"></div>
-					# 		""",
-					# 		unsafe_allow_html=True
-					# )
-					# with col2:
-					# 	st.write("**Searching market data...**")
-
-					# Web scraping
-					scraping_results = None
-					if do_market_extraction:
-						try:
-							# Use the effective scraper to find equipment listings and prices
-							scraping_results = scrape_effective_sites(
-								brand_parsed,
-								model_parsed,
-								payload["normalized"]["options"]
-							)
-						except Exception as e:
-							# Handle scraping errors gracefully
-							scraping_results = None
-					else:
-						st.info("Market data extraction skipped.")
-
-					# Define analysis steps for progress display
-					steps = [
-						"Parsing equipment data",
-						"Explaining options",
-						# "Searching market data"  # Commented out in UI but functionality exists
-					]
-
-					# Display completion status for each analysis step
-					for step in steps:
-						col1, col2 = st.columns([0.05, 0.95])  # smaller gap
-						with col1:
-							# if step == "Searching market data" and not do_market_extraction:
-							# 	st.markdown("➖") # Use a different icon for skipped step
-							# else:
-							st.markdown("✅")
-						with col2:
-							st.markdown(
-								f"<span style='font-size:16px; font-weight:600;'>{step}</span>",
-								unsafe_allow_html=True
-							)
-
-					# Store analysis results in session state for caching and display
-					st.session_state["analysis_key"] = f"{brand_parsed}|{model_parsed}"
-					st.session_state["analysis_payload"] = payload
-					# Only store scraping results if market extraction was performed
-					st.session_state["analysis_scraping"] = scraping_results if do_market_extraction else None
-					st.session_state["option_explanations"] = option_explanations
-
-				# Display complete analysis results (only after everything is ready)
-				if st.session_state.get("analysis_key") == analysis_key_current:
-					# Retrieve cached analysis results from session state
-					payload = st.session_state.get("analysis_payload")
-					scraping_results = st.session_state.get("analysis_scraping")
-					option_explanations = st.session_state.get("option_explanations", {})
-
-					# Display results section
-					st.markdown("---")
-					st.subheader("📋 Complete Analysis Results")
-
-					# Show raw parsing results in JSON format
-					st.markdown("**✅ Equipment Analysis:**")
-					st.code(json.dumps(payload, indent=2), language="json")
-
-					# Options explorer with tabular display
-					options_list = payload.get("normalized", {}).get("options", []) or []
-					st.markdown("**🔧 Options Explorer:**")
-					
-					if not options_list:
-						st.info("No options found for this equipment model.")
-					else:
-						# Create table data with AI-determined categories for each option
-						table_data = []
-						for i, opt in enumerate(options_list):
-							explanation = option_explanations.get(opt, "No description available.")
-							
-							# Use AI to categorize each option for better organization
-							category = "General"  # Default category
-							try:
-								if client_for_opts is not None:
-									# Create prompt for option categorization
-									category_prompt = (
-										f"Based on this option description: '{explanation}' for option '{opt}', "
-										f"categorize it into one of these categories: Connectivity, Software, Calibration, Power, Display, Storage, Communication, or General. "
-										f"Respond with only the category name, nothing else."
-									)
-									# Call AI for categorization
-									category_completion = client_for_opts.chat.completions.create(
-										model=MODEL_NAME,
-										temperature=0.1,  # Lower temperature for more consistent categorization
-										messages=[
-											{"role": "system", "content": "You are a helpful expert that categorizes test equipment options. Respond with only the category name."},
-											{"role": "user", "content": category_prompt},
-										],
-									)
-									api_category = category_completion.choices[0].message.content.strip()
-									# Validate the category is one of our predefined ones
-									valid_categories = ["Connectivity", "Software", "Calibration", "Power", "Display", "Storage", "Communication", "General"]
-									if api_category in valid_categories:
-										category = api_category
-							except Exception as e:
-								category = "General"  # Fallback to default category
-							
-							# Add option data to table
-							table_data.append({
-								"Row": i + 1,
-								"Option Code": opt,
-								"Category": category,
-								"Description": explanation
-							})
-
-						# Generate Markdown table for options display
-						markdown_table = "**All available options for this equipment:**\n\n"
-						markdown_table += "| Row | Option Code | Category | Description |\n"
-						markdown_table += "|-----|-------------|----------|-------------|\n"
-						
-						# Add each option row to the table
-						for row_data in table_data:
-							# Escape pipe characters in description to prevent breaking table format
-							description = str(row_data['Description']).replace("|", "\\|")
-							markdown_table += f"| {row_data['Row']} | {row_data['Option Code']} | {row_data['Category']} | {description} |\n"
-						
-						# Display the formatted table
-						st.markdown(markdown_table)
-
-					# Display market data results (if available)
-					if do_market_extraction:
-						# Note: Market data display is currently commented out in the UI
-						# but the data is still collected and could be displayed
-						scraping_json = {"web_scraping_results": []}
-						if scraping_results and "search_results" in scraping_results and scraping_results["search_results"]:
-							# Process and format market data results
-							for result in scraping_results["search_results"]:
-								scraping_json["web_scraping_results"].append({
-									"brand": result.get('brand', 'N/A'),
-									"model": result.get('model', 'N/A'),
-									"price": result.get('price', 'Price not available'),
-									"vendor": result.get('vendor', 'Vendor not available'),
-									"web_url": result.get('web_url', 'URL not available'),
-									"qty_available": result.get('qty_available', 'Quantity not available'),
-									"source": result.get('source', 'Source not available')
-							})
-						# Note: Market data JSON display is commented out
-						# st.code(json.dumps(scraping_json, indent=2), language="json")
-			else:
-				# Show message when no equipment is selected
-				st.info("👆 Please select an equipment entry from the dropdown above.")
+			# Only the analysis fragment reruns on Analyze clicks, not the whole app
+			_analysis_fragment(header, rows[selected_index], do_market_extraction)
 	else:
 		# Show error if no dataset is available
 		st.error("No dataset available.")
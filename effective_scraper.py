@@ -20,6 +20,7 @@ Dependencies:
 
 import json
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, List, Optional
 import re
 from urllib.parse import quote_plus, urljoin, urlparse
@@ -37,15 +38,27 @@ class EffectiveScraper:
     with pricing and availability information.
     """
     
-    def __init__(self):
+    def __init__(self, adapter: Optional[HTTPAdapter] = None):
         """
         Initialize the scraper with session configuration and headers.
         
         Sets up HTTP session with appropriate headers to mimic real browser
         requests and avoid detection by anti-bot systems.
+        
+        Each scraper has its own session, so headers and cookies are never
+        shared between scrapes. Connection pools live in the transport
+        adapter, which is thread-safe and can be shared instead.
+        
+        Args:
+            adapter (Optional[HTTPAdapter]): Shared transport adapter to reuse
+                pooled keep-alive connections across scrapes; the session's
+                default adapters are used if omitted
         """
-        # Create persistent HTTP session for connection reuse
+        # Create the HTTP session, mounting the shared adapter for connection reuse
         self.session = requests.Session()
+        if adapter is not None:
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
         
         # Set desktop browser headers to avoid detection
         self.session.headers.update({
@@ -688,7 +701,12 @@ class EffectiveScraper:
         }
 
 
-def scrape_effective_sites(brand: str, model: str, options: List[str] = None) -> Dict[str, Any]:
+def scrape_effective_sites(
+    brand: str,
+    model: str,
+    options: List[str] = None,
+    adapter: Optional[HTTPAdapter] = None
+) -> Dict[str, Any]:
     """
     Main function to scrape equipment market data using effective methods.
     
@@ -699,9 +717,10 @@ def scrape_effective_sites(brand: str, model: str, options: List[str] = None) ->
         brand (str): Equipment brand name
         model (str): Equipment model number
         options (List[str], optional): Equipment options (currently unused)
+        adapter (Optional[HTTPAdapter]): Shared transport adapter for connection reuse
         
     Returns:
         Dict[str, Any]: Comprehensive market data including listings, pricing, and metadata
     """
-    scraper = EffectiveScraper()
+    scraper = EffectiveScraper(adapter=adapter)
     return scraper.scrape_comprehensive(brand, model)
@@ -11,12 +11,21 @@ Key Features:
 - Deterministic option splitting
 
 Dependencies:
+- re: Regular expressions for options extraction
 - typing: Type hints for better code documentation
 """
 
+import re
 from typing import Dict
 
 
+# Common connecting words that don't represent equipment info
+_STOPWORDS = frozenset({"with", "options", "option", "like", "such", "as", "enter", "a", "query"})
+
+# Brand/model text before the first "/", then the options up to the next whitespace
+_OPTIONS_RE = re.compile(r"(?P<head>[^/]*)(?P<opts>/\S*)")
+
+
 def parse_query(text: str) -> Dict[str, str]:
     """
     Parse free-form text to extract equipment brand, model, and options.
@@ -37,14 +46,15 @@ def parse_query(text: str) -> Dict[str, str]:
     # Clean input text by removing leading/trailing whitespace
     text = text.strip()
     
-    # Look for the first "/" to separate brand/model from options
-    slash_index = text.find("/")
+    # Split into the brand/model part before the first "/" and the options
+    # part running from that "/" up to the next whitespace
+    match = _OPTIONS_RE.match(text)
     
-    if slash_index == -1:
+    if match is None:
         # No options found, just brand and model
         words = text.split()
         # Filter out common connecting words that don't represent equipment info
-        filtered_words = [word for word in words if word.lower() not in ["with", "options", "option", "like", "such", "as", "enter", "a", "query", "like"]]
+        filtered_words = [word for word in words if word.lower() not in _STOPWORDS]
         
         # Extract brand (first meaningful word) and model (second meaningful word)
         brand = filtered_words[0] if filtered_words else ""
@@ -52,59 +62,19 @@ def parse_query(text: str) -> Dict[str, str]:
         
         return {"brand": brand, "model": model, "raw_options": ""}
     
-    # Find the end of options (next space after the last "/" sequence)
-    # Look for patterns like "/160/EEC/PLK/UK6 has to be" -> stop at "has"
-    options_end_index = slash_index
-    current_pos = slash_index
-    
-    # Iterate through all slashes to find the complete options section
-    while current_pos < len(text):
-        # Find next "/" character
-        next_slash = text.find("/", current_pos + 1)
-        if next_slash == -1:
-            # No more slashes, find the next space to determine end
-            next_space = text.find(" ", current_pos)
-            if next_space == -1:
-                # No space found, take everything to the end
-                options_end_index = len(text)
-            else:
-                # Found space, check if there's a word after the last "/"
-                last_part = text[current_pos:next_space].strip()
-                if last_part and not last_part.startswith("/"):
-                    # There's a word after the last "/", include it
-                    options_end_index = next_space
-                else:
-                    # Just slashes, stop at the last "/"
-                    options_end_index = current_pos + 1
-            break
-        else:
-            # Found another "/", continue searching
-            current_pos = next_slash
-    
     # Extract brand/model part (everything before first "/")
-    brand_model_part = text[:slash_index].strip()
-    brand_model_words = brand_model_part.split()
+    brand_model_words = match.group("head").split()
     
     # Filter out common connecting words from brand/model section
-    filtered_words = [word for word in brand_model_words if word.lower() not in ["with", "options", "option", "like", "such", "as", "enter", "a", "query", "like"]]
+    filtered_words = [word for word in brand_model_words if word.lower() not in _STOPWORDS]
     
     # Extract brand (first meaningful word) and model (second meaningful word)
     brand = filtered_words[0] if filtered_words else ""
     model = filtered_words[1] if len(filtered_words) > 1 else ""
     
-    # Find the last word before the "/" - this should be the first option
-    last_word_before_slash = ""
-    if brand_model_words:
-        last_word = brand_model_words[-1]
-        # If the last word is not a connecting word, it's the first option
-        if last_word.lower() not in ["with", "options", "option", "like", "such", "as", "enter", "a", "query", "like"]:
-            last_word_before_slash = last_word
-    
-    # Extract options part (from first "/" to end of options)
-    options_part = text[slash_index:options_end_index].strip()
-    
-    # Don't combine with last word before slash to avoid including model name
-    raw_options = options_part
+    # Options part, e.g. "/160/EEC/PLK/UK6 has to be" -> "/160/EEC/PLK/UK6".
+    # The last word before the "/" is not included to avoid picking up the model name
+    raw_options = match.group("opts")
     
     return {"brand": brand, "model": model, "raw_options": raw_options}
 
@@ -11,17 +11,152 @@ Key Features:
 - Marketplace search simulation
 - Structured JSON response handling
 - Error handling and fallback responses
+- Async (AsyncOpenAI) entry points with blocking *_sync variants
+- In-process LRU cache for deterministic parsing results
+- Optional semantic cache that reuses parsing results of paraphrased queries
+- Batched parsing of several texts in one request, with an auto-batcher
+- Shared OpenAI client and an async client factory with HTTP/2 multiplexing
+- Persistent TTL cache of marketplace search results
+- Streamed marketplace responses, closed as soon as the JSON object is complete
+- Parallel marketplace searches, one per query variant, merged locally
+- Concurrency limit and rate-limit retries for API requests
+- Prompt size checks against the model context window
+- Local regex parsing of well-formed queries, with AI as the fallback
 
 Dependencies:
 - openai: OpenAI API client for language model interactions
+- httpx[http2]: HTTP/2 transport shared by concurrent requests
+- diskcache: Marketplace search results shared across processes and restarts
+- tenacity: Exponential backoff when the API reports a rate limit
+- tiktoken: Token counting of prompts
 - json: JSON data handling
+- orjson (optional): Faster parsing of API responses
+- re: Local parsing of well-formed queries
+- asyncio/weakref: Gathering concurrent parse requests into batches
+- concurrent.futures: Parallel marketplace searches for blocking callers
+- collections/threading/copy: Thread-safe LRU cache of parsing results
+- sentence-transformers (optional): Query embeddings for the semantic cache
 - typing: Type hints for better code documentation
 """
 
+import asyncio
+import copy
+import io
 import json
-from typing import Dict, Any, List
+import os
+import re
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple, Union
 
-from openai import OpenAI
+import diskcache
+import httpx
+import tiktoken
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+# Parse responses with orjson when available; its JSONDecodeError subclasses
+# json.JSONDecodeError, so error handling is the same for both
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
+if TYPE_CHECKING:
+    # Only needed with sentence-transformers, which depends on it
+    import numpy as np
+
+
+# LRU cache of deterministic (temperature 0) parsing results
+_PARSE_CACHE_MAXSIZE = 1024  # Maximum number of cached parsing results
+_PARSE_CACHE: "OrderedDict[Tuple[str, str, float], Dict[str, Any]]" = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()  # Never held across an await, so safe for sync and async callers
+
+# Semantic cache of parsing results (enabled when sentence-transformers is installed)
+_SEMANTIC_MODEL_NAME = "all-MiniLM-L6-v2"
+_SEMANTIC_THRESHOLD = 0.97  # Minimum cosine similarity to reuse a cached result
+_SEMANTIC_CACHE_SIZE = 10000  # Oldest entries are replaced first
+
+# Words SYSTEM_PROMPT tells the model to ignore when looking for brand and model
+_STOPWORDS = frozenset({
+    "enter", "a", "query", "like", "with", "options", "option", "such", "as",
+    "the", "is", "has", "to", "be", "delivered", "soon", "please", "need",
+    "want", "find", "search", "looking", "for",
+})
+
+# Word immediately before the first "/" (first option) and the "/"-separated tail
+_OPT_RE = re.compile(r"([^\s/]*)((?:/[^\s/]*)+)")
+
+# Punctuation trimmed from words, e.g. "like:" or "UK6,"
+_WORD_PUNCTUATION = ":;,."
+
+# Connection pool of clients built by make_openai_client
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+# Maximum number of concurrent API requests per event loop
+_OPENAI_CONCURRENCY = int(os.getenv("ATE_OPENAI_CONCURRENCY", "20"))
+_SEMAPHORES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+# Retry policy for rate-limited async requests; waits happen outside the semaphore.
+# Blocking requests rely on the OpenAI client's own retries instead
+_RATE_LIMIT_RETRY = retry(
+    retry=retry_if_exception_type(RateLimitError),
+    wait=wait_random_exponential(min=1, max=60),
+    stop=stop_after_attempt(6),
+    reraise=True,
+)
+
+# Disk cache of marketplace search results
+_MARKETPLACE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "ate_mkt_cache")
+_MARKETPLACE_CACHE_SIZE_LIMIT = 1 << 30  # 1 GiB
+_MARKETPLACE_CACHE_TTL = 6 * 60 * 60  # Search results are reused for 6 hours
+_MARKETPLACE_FAILURE_TTL = 60  # Failed searches are not retried for a minute
+
+# Query variants searched in parallel, appended to "<brand> <model>"
+_SEARCH_VARIANTS = (
+    "", "datasheet", "specifications", "product page", "used",
+    "refurbished", "rental", "for sale", "buy", "price",
+)
+
+# User prompt for a single search query, filled in with brand, model and query
+_SEARCH_VARIANT_TPL = (
+    "TARGET EQUIPMENT: %s %s\n"
+    "SEARCH QUERY: \"%s\"\n\n"
+    "List the product listings this query finds. "
+    "OUTPUT: Return ONLY the JSON object with search_results."
+)
+
+# Currency and amount of a listed price, e.g. "$1,234.56" or "EUR 1.234,56"
+_PRICE_RE = re.compile(r"\d(?:[\d.,]*\d)?")
+_CURRENCY_RE = re.compile(r"US\$|[$\u20ac\u00a3\u00a5\u20b9]|\b[A-Z]{3}\b")
+_CURRENCY_CODES = {
+    "$": "USD", "US$": "USD", "\u20ac": "EUR", "\u00a3": "GBP", "\u00a5": "JPY", "\u20b9": "INR",
+}
+
+# Splits brand names into tokens, e.g. "Agilent/HP Keysight" -> agilent, hp, keysight
+_BRAND_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_marketplace_cache_instance: Optional[diskcache.Cache] = None
+
+# Stronger model to retry a marketplace search with when results are weak.
+# Only models supporting structured outputs can be used (not gpt-4/gpt-4-turbo)
+_ESCALATE_MODEL_MAP = {"gpt-4o-mini": "gpt-4o"}
+
+# Context window sizes in tokens; prompts for other models are not checked
+MODEL_LIMITS = {
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+}
+_RESPONSE_TOKEN_RESERVE = 512  # Tokens kept free for the model's answer
+
+# Auto-batcher settings
+_AUTO_BATCH_WINDOW = 0.05  # Seconds to wait for more requests before sending a batch
+_AUTO_BATCH_MAX_SIZE = 20  # Maximum number of texts in one batched request
 
 
 # System prompt for equipment text parsing
@@ -65,126 +200,31 @@ SYSTEM_PROMPT = (
 
 # System prompt for comprehensive marketplace search (currently unused but available)
 SYSTEM_PROMPT_COMPLETE_MARKETPLACE = """
-You are an expert electronic test equipment researcher with COMPLETE knowledge of the global marketplace. Your task is to find REAL, WORKING product listings from ANYWHERE in the world where this equipment is available.
-
-CRITICAL REQUIREMENTS:
-
-1) SEARCH THE ENTIRE MARKETPLACE - NO LIMITATIONS:
-   - Search ALL possible sources: manufacturers, dealers, distributors, marketplaces, auction sites, classifieds, etc.
-   - Include: eBay, Amazon, Alibaba, AliExpress, local marketplaces, specialized equipment vendors
-   - Include: manufacturer websites, authorized dealers, independent sellers, refurbished equipment vendors
-   - Include: rental companies, calibration labs, test equipment specialists
-   - NO restrictions on which websites to search - find it wherever it exists
-
-2) URL VALIDATION - WORKING LINKS ONLY:
-   - ONLY return URLs that you KNOW are working and accessible
-   - URLs MUST be direct product pages, NOT search results
-   - URLs MUST contain the exact product information
-   - NO 404 errors or broken links
-   - If you're not 100% sure a URL works, DON'T include it
-
-3) PRICING REQUIREMENTS:
-   - MUST find ACTUAL prices, not "Contact for pricing" unless absolutely necessary
-   - Look for specific price amounts: $1,234.56, €1,234.56, £1,234.56, ¥1,234.56
-   - Handle price ranges: "$1,000-$2,000"
-   - Normalize to USD when possible
-   - If no price found, mark as "Price not available"
-
-4) COMPREHENSIVE SEARCH STRATEGY:
-   - Use EXACT model numbers: "Agilent 8116A" not "Agilent 8116"
-   - Include specific options: "Agilent 8116A 160MHz"
-   - Search for datasheets and product specifications
-   - Look for official product catalogs
-   - Use manufacturer part numbers when available
-   - Search for used, refurbished, and demo equipment
-   - Search for rental and lease options
-
-5) PRODUCT VERIFICATION:
-   - MUST contain exact brand name (Agilent/Keysight, Tektronix, etc.)
-   - MUST contain exact model number (8116A, DSOX1204G, etc.)
-   - MUST contain at least ONE specified option (160, EEC, PLK, UK6)
-   - MUST be a real product page with specifications
-   - MUST have working URL that leads to product information
-
-6) GLOBAL MARKETPLACE SEARCH:
-   - Search ALL major marketplaces: eBay, Amazon, Alibaba, AliExpress, etc.
-   - Search ALL manufacturer websites: Keysight, Tektronix, Rohde & Schwarz, etc.
-   - Search ALL authorized dealers and distributors
-   - Search ALL specialized test equipment vendors
-   - Search ALL auction sites and classifieds
-   - Search ALL rental and refurbished equipment companies
-
-7) QUALITY CONTROL:
-   - REJECT any URL that might be a search results page
-   - REJECT any URL that doesn't contain the specific model
-   - REJECT any URL that doesn't have pricing information
-   - REJECT any URL that might lead to 404 errors
-   - ONLY include URLs you are 100% confident will work
-
-8) OPTION MATCHING:
-   - Look for exact option codes: "160", "EEC", "PLK", "UK6"
-   - Check for option descriptions: "160 MHz bandwidth", "EEC compliance"
-   - Verify option compatibility with the model
-   - Handle option variations: "160MHz" vs "160 MHz"
-
-9) PRICING EXTRACTION:
-   - Extract actual numerical prices with currency symbols
-   - Handle various formats: "$1,234.56", "1,234.56 USD", "€1.234,56", "¥1,234.56"
-   - Look for price ranges and use average or range
-   - Handle "Contact for pricing" only when no other price is available
-
-10) VENDOR VERIFICATION:
-    - Use official company names
-    - Clean vendor names: remove "electronics", "store", "shop"
-    - Include ALL types of vendors: manufacturers, dealers, distributors, sellers
-    - Don't limit to specific vendors - find it wherever it's available
-
-SEARCH QUERIES TO TRY (search ALL of these):
-- "{brand} {model}"
-- "{brand} {model} datasheet"
-- "{brand} {model} specifications"
-- "{brand} {model} product page"
-- "{brand} {model} used"
-- "{brand} {model} refurbished"
-- "{brand} {model} rental"
-- "{brand} {model} for sale"
-- "{brand} {model} buy"
-- "{brand} {model} price"
-
-CRITICAL: Search the ENTIRE marketplace without any limitations. Find this equipment wherever it exists in the world and return ONLY working, verified URLs with actual pricing information.
-
-OUTPUT FORMAT:
-Return ONLY valid JSON with the following structure:
-{
-  "search_results": [
-    {
-      "brand": "string (exact brand name)",
-      "model": "string (exact model number)",
-      "options": ["array of matched options"],
-      "price": "string (actual price or 'Price not available')",
-      "vendor": "string (specific vendor name)",
-      "web_url": "string (DIRECT product page URL - MUST be working)",
-      "qty_available": "string (stock information)",
-      "source": "string (website source)",
-      "option_details": "string (details about matched options)"
-    }
-  ],
-  "search_summary": {
-    "total_results": number,
-    "exact_matches": number,
-    "partial_matches": number,
-    "price_range": "string",
-    "vendor_count": number,
-    "search_quality_score": "high|medium|low",
-    "recommendations": ["array of search improvement suggestions"],
-    "search_queries_used": ["array of search queries attempted"]
-  }
-}
+You are an expert electronic test equipment researcher. Find real product listings for the requested equipment from any source worldwide (manufacturers, dealers, marketplaces, refurbishers, rental companies).
 
-CRITICAL: Only return URLs that you are 100% confident will work and lead to actual product pages with pricing information. Search the ENTIRE marketplace without any restrictions.
+RULES:
+1) Return only working URLs of direct product pages - never search result pages, and leave out any URL you are not sure of.
+2) Give the actual listed price with its currency, or "Price not available".
+3) Include only listings that match the exact brand and model.
+4) Return JSON matching the provided schema.
+5) No prose outside the JSON.
 """
 
 
+# User prompt template for equipment text parsing, filled in with the original text
+_USER_TPL = (
+    "PARSE THIS INPUT TEXT:\n\n"
+    "ORIGINAL TEXT: %s\n\n"
+    "EXTRACTION TASK:\n"
+    "1) Extract the brand (first meaningful word before '/')\n"
+    "2) Extract the model (second meaningful word before '/')\n"
+    "3) Extract ALL options (including the word before first '/' and everything after split by '/')\n"
+    "4) Ignore any text after the last option\n"
+    "\n"
+    "OUTPUT: Return ONLY the JSON object with 'normalized' and 'results' keys."
+)
+
+
 def build_user_prompt(original_text: str) -> str:
     """
     Build user prompt for equipment text parsing.
@@ -198,331 +238,1632 @@ def build_user_prompt(original_text: str) -> str:
     Returns:
         str: Formatted prompt for AI processing
     """
-    return (
-        "PARSE THIS INPUT TEXT:\n\n"
-        f"ORIGINAL TEXT: {original_text}\n\n"
-        "EXTRACTION TASK:\n"
-        "1) Extract the brand (first meaningful word before '/')"
-        "2) Extract the model (second meaningful word before '/')"
-        "3) Extract ALL options (including the word before first '/' and everything after split by '/')"
-        "4) Ignore any text after the last option"
-        "\n"
-        "OUTPUT: Return ONLY the JSON object with 'normalized' and 'results' keys."
-    )
+    return _USER_TPL % (original_text,)
 
 
-def build_complete_marketplace_search_prompt(brand: str, model: str, options: List[str] = None) -> str:
+def build_batch_user_prompt(texts: List[str]) -> str:
     """
-    Build the user prompt for complete marketplace search - simplified for brand + model only.
-    
-    This function creates a comprehensive prompt for AI-powered marketplace search,
-    though this functionality is currently not used in the main application.
+    Build user prompt for parsing several equipment texts in one request.
     
     Args:
-        brand (str): Equipment brand name
-        model (str): Equipment model number
-        options (List[str], optional): Equipment options (currently unused)
+        texts (List[str]): Raw input texts containing equipment information
         
     Returns:
-        str: Formatted prompt for marketplace search
-    """
-    
-    return f"""
-COMPLETE MARKETPLACE SEARCH TASK - BRAND + MODEL ONLY:
-
-TARGET EQUIPMENT:
-- Brand: {brand}
-- Model: {model}
-- Full Query: {brand} {model}
-
-CRITICAL SEARCH REQUIREMENTS:
-
-1) SEARCH THE ENTIRE MARKETPLACE - NO LIMITATIONS:
-   - Search ALL possible sources: manufacturers, dealers, distributors, marketplaces, auction sites, classifieds, etc.
-   - Include: eBay, Amazon, Alibaba, AliExpress, local marketplaces, specialized equipment vendors
-   - Include: manufacturer websites, authorized dealers, independent sellers, refurbished equipment vendors
-   - Include: rental companies, calibration labs, test equipment specialists
-   - NO restrictions on which websites to search - find it wherever it exists
-
-2) URL VALIDATION - WORKING LINKS ONLY:
-   - ONLY return URLs that you KNOW are working and accessible
-   - URLs MUST be direct product pages, NOT search results
-   - URLs MUST contain the exact product information
-   - NO 404 errors or broken links
-   - If you're not 100% sure a URL works, DON'T include it
-
-3) PRICING REQUIREMENTS:
-   - MUST find ACTUAL prices, not "Contact for pricing" unless absolutely necessary
-   - Look for specific price amounts: $1,234.56, €1,234.56, £1,234.56, ¥1,234.56
-   - Handle price ranges: "$1,000-$2,000"
-   - Normalize to USD when possible
-   - If no price found, mark as "Price not available"
-
-4) COMPREHENSIVE SEARCH STRATEGY:
-   - Use EXACT model numbers: "{brand} {model}"
-   - Search for datasheets and product specifications
-   - Look for official product catalogs
-   - Use manufacturer part numbers when available
-   - Search for used, refurbished, and demo equipment
-   - Search for rental and lease options
-
-5) PRODUCT VERIFICATION:
-   - MUST contain exact brand name ({brand})
-   - MUST contain exact model number ({model})
-   - MUST be a real product page with specifications
-   - MUST have working URL that leads to product information
-
-6) GLOBAL MARKETPLACE SEARCH:
-   - Search ALL major marketplaces: eBay, Amazon, Alibaba, AliExpress, etc.
-   - Search ALL manufacturer websites: Keysight, Tektronix, Rohde & Schwarz, etc.
-   - Search ALL authorized dealers and distributors
-   - Search ALL specialized test equipment vendors
-   - Search ALL auction sites and classifieds
-   - Search ALL rental and refurbished equipment companies
-
-7) QUALITY CONTROL:
-   - REJECT any URL that might be a search results page
-   - REJECT any URL that doesn't contain the specific model ({model})
-   - REJECT any URL that doesn't have pricing information
-   - REJECT any URL that might lead to 404 errors
-   - ONLY include URLs you are 100% confident will work
-
-8) PRICING EXTRACTION:
-   - Extract actual numerical prices with currency symbols
-   - Handle various formats: "$1,234.56", "1,234.56 USD", "€1.234,56", "¥1,234.56"
-   - Look for price ranges and use average or range
-   - Handle "Contact for pricing" only when no other price is available
-
-9) VENDOR VERIFICATION:
-    - Use official company names
-    - Clean vendor names: remove "electronics", "store", "shop"
-    - Include ALL types of vendors: manufacturers, dealers, distributors, sellers
-    - Don't limit to specific vendors - find it wherever it's available
-
-SEARCH QUERIES TO TRY (search ALL of these):
-- "{brand} {model}"
-- "{brand} {model} datasheet"
-- "{brand} {model} specifications"
-- "{brand} {model} product page"
-- "{brand} {model} used"
-- "{brand} {model} refurbished"
-- "{brand} {model} rental"
-- "{brand} {model} for sale"
-- "{brand} {model} buy"
-- "{brand} {model} price"
-
-CRITICAL: Search the ENTIRE marketplace without any limitations. Find this equipment wherever it exists in the world and return ONLY working, verified URLs with actual pricing information.
-
-OUTPUT: Return ONLY the JSON object with search_results and search_summary.
-"""
+        str: Formatted prompt asking for one parsing result per text, in input order
+    """
+    numbered = "\n".join(f"{i}) {text}" for i, text in enumerate(texts, 1))
+    return (
+        f"PARSE EACH OF THE FOLLOWING {len(texts)} INPUT TEXTS:\n\n"
+        f"{numbered}\n\n"
+        "Apply the extraction rules to every text independently.\n"
+        "OUTPUT: Return ONLY a JSON object of the form "
+        '{"batch": [{"normalized": {...}, "results": []}, ...]} '
+        "with exactly one entry per input text, in input order."
+    )
 
 
-def normalize_options_via_llm(
-    client: OpenAI,
-    original_text: str,
-    llm_model: str,
-    temperature: float,
-) -> Dict[str, Any]:
-    """
-    Use AI to normalize and parse equipment options from text.
-    
-    This function sends equipment text to OpenAI's language model to extract
-    structured information including brand, model, and options. It handles
-    JSON parsing and provides fallback responses for error cases.
-    
-    Args:
-        client (OpenAI): OpenAI API client instance
-        original_text (str): Raw equipment text to parse
-        llm_model (str): OpenAI model to use (e.g., "gpt-4")
-        temperature (float): Temperature setting for AI responses
-        
-    Returns:
-        Dict[str, Any]: Parsed equipment data with normalized structure
-    """
-    # Define expected JSON schema for AI response validation
-    schema = {
-        "name": "normalized_payload",
-        "schema": {
-            "type": "object",
-            "properties": {
-                "normalized": {
+# Expected JSON schema for equipment parsing responses
+_NORMALIZED_SCHEMA = {
+    "name": "normalized_payload",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "normalized": {
+                "type": "object",
+                "properties": {
+                    "brand": {"type": "string"},
+                    "model": {"type": "string"},
+                    "options": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["brand", "model", "options"],
+                "additionalProperties": False
+            },
+            "results": {
+                "type": "array",
+                "items": {"type": "object", "properties": {}, "required": [], "additionalProperties": False}
+            }
+        },
+        "required": ["normalized", "results"],
+        "additionalProperties": False
+    },
+    "strict": True
+}
+
+# Expected JSON schema for batched equipment parsing responses
+_BATCH_SCHEMA = {
+    "name": "normalized_payload_batch",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "batch": {"type": "array", "items": _NORMALIZED_SCHEMA["schema"]}
+        },
+        "required": ["batch"],
+        "additionalProperties": False
+    },
+    "strict": True
+}
+
+
+# Expected JSON schema for complete marketplace search responses
+_MARKETPLACE_SCHEMA = {
+    "name": "complete_marketplace_search_payload",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "search_results": {
+                "type": "array",
+                "items": {
                     "type": "object",
                     "properties": {
                         "brand": {"type": "string"},
                         "model": {"type": "string"},
-                        "options": {"type": "array", "items": {"type": "string"}}
+                        "price": {"type": "string"},
+                        "vendor": {"type": "string"},
+                        "web_url": {"type": "string"},
+                        "qty_available": {"type": "string"},
+                        "source": {"type": "string"}
                     },
-                    "required": ["brand", "model", "options"],
+                    "required": ["brand", "model", "price", "vendor", "web_url", "qty_available", "source"],
                     "additionalProperties": False
-                },
-                "results": {"type": "array", "items": {"type": "object"}}
+                }
             },
-            "required": ["normalized", "results"],
-            "additionalProperties": False
+            "search_summary": {
+                "type": "object",
+                "properties": {
+                    "total_results": {"type": "integer"},
+                    "exact_matches": {"type": "integer"},
+                    "partial_matches": {"type": "integer"},
+                    "price_range": {"type": "string"},
+                    "vendor_count": {"type": "integer"},
+                    "search_quality_score": {"type": "string", "enum": ["high", "medium", "low"]},
+                    "recommendations": {"type": "array", "items": {"type": "string"}},
+                    "search_queries_used": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": [
+                    "total_results", "exact_matches", "partial_matches", "price_range", "vendor_count",
+                    "search_quality_score", "recommendations", "search_queries_used"
+                ],
+                "additionalProperties": False
+            }
         },
-        "strict": True
-    }
+        "required": ["search_results", "search_summary"],
+        "additionalProperties": False
+    },
+    "strict": True
+}
 
-    # Build user prompt for equipment parsing
-    user_prompt = build_user_prompt(original_text)
+# Expected JSON schema for the listings found by one search query
+_SEARCH_RESULTS_SCHEMA = {
+    "name": "marketplace_search_results",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "search_results": _MARKETPLACE_SCHEMA["schema"]["properties"]["search_results"]
+        },
+        "required": ["search_results"],
+        "additionalProperties": False
+    },
+    "strict": True
+}
 
-    # Call OpenAI API for text processing
-    completion = client.chat.completions.create(
-        model=llm_model,
-        temperature=temperature,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
 
-    # Extract and parse AI response
-    content = completion.choices[0].message.content or "{}"
+def _empty_normalized_payload() -> Dict[str, Any]:
+    """
+    Build the fallback parsing result used when the AI response is unusable.
+    
+    Returns:
+        Dict[str, Any]: Normalized structure with empty brand, model and options
+    """
+    return {
+        "normalized": {
+            "brand": "",
+            "model": "",
+            "options": []
+        },
+        "results": []
+    }
+
+
+def _parse_normalized_content(content: str) -> Dict[str, Any]:
+    """
+    Parse the AI response of an equipment parsing request.
+    
+    The structure is enforced by the API through _NORMALIZED_SCHEMA, so only
+    a missing or truncated response (e.g. a refusal) needs the fallback.
+    
+    Args:
+        content (str): Raw message content returned by the model
+        
+    Returns:
+        Dict[str, Any]: Parsed equipment data, or the fallback structure if the
+            response is not valid JSON
+    """
     try:
-        data = json.loads(content)
-        # Ensure the response has the correct structure
-        if "normalized" not in data:
-            data = {
-                "normalized": {
-                    "brand": "",
-                    "model": "",
-                    "options": []
-                },
-                "results": []
-            }
-        return data
-    except Exception:
+        return _json.loads(content)
+    except json.JSONDecodeError:
         # Return fallback structure if JSON parsing fails
-        return {
-            "normalized": {
-                "brand": "",
-                "model": "",
-                "options": []
-            },
-            "results": []
+        return _empty_normalized_payload()
+
+
+def _empty_marketplace_result(price_range: str, recommendation: str) -> Dict[str, Any]:
+    """
+    Build an empty marketplace search result.
+    
+    Args:
+        price_range (str): Text for the summary's price range field
+        recommendation (str): Single recommendation explaining the empty result
+        
+    Returns:
+        Dict[str, Any]: Marketplace search structure without results
+    """
+    return {
+        "search_results": [],
+        "search_summary": {
+            "total_results": 0,
+            "exact_matches": 0,
+            "partial_matches": 0,
+            "price_range": price_range,
+            "vendor_count": 0,
+            "search_quality_score": "low",
+            "recommendations": [recommendation],
+            "search_queries_used": []
         }
+    }
 
 
-def complete_marketplace_search_via_llm(
-    client: OpenAI,
-    brand: str,
-    model: str,
-    options: List[str] = None,
-    llm_model: str = "gpt-4",
-    temperature: float = 0.0
-) -> Dict[str, Any]:
+def make_openai_client(api_key: Optional[str] = None, http2: bool = True) -> AsyncOpenAI:
     """
-    Use LLM to search the COMPLETE marketplace without any limitations.
+    Create an async OpenAI client suited to many concurrent requests.
     
-    This function simulates comprehensive marketplace search using AI,
-    though it's currently not used in the main application. It provides
-    a framework for AI-powered market research.
+    With HTTP/2 (requires the h2 package, installed by httpx[http2]),
+    concurrent requests are multiplexed over one connection instead of
+    each opening its own TCP/TLS connection. Falls back to HTTP/1.1 when
+    h2 is missing.
+    
+    Create the client once and pass it to every call. The connection pool is
+    bound to the event loop that first uses it, so keep the client within one
+    loop rather than sharing it across separate asyncio.run() calls.
+    
+    The client's own retries are disabled (max_retries=0): _create_completion
+    retries rate limits with backoff outside the concurrency limit, and SDK
+    retries would multiply its attempts while holding a slot.
+    
+    Args:
+        api_key (Optional[str]): OpenAI API key (defaults to OPENAI_API_KEY)
+        http2 (bool): Whether to enable HTTP/2
+        
+    Returns:
+        AsyncOpenAI: Async OpenAI API client instance
+    """
+    try:
+        http_client = DefaultAsyncHttpxClient(http2=http2, limits=_HTTP_LIMITS)
+    except ImportError:
+        # h2 is not installed
+        http_client = DefaultAsyncHttpxClient(limits=_HTTP_LIMITS)
+    return AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+
+def _loop_state(registry: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]", factory: Callable[[], Any]) -> Any:
+    """
+    Return the per-loop state of the running event loop, creating it on first use.
+    
+    Semaphores and clients end up referencing their loop, which defeats the
+    weak keys, so entries of closed loops are also dropped whenever a new
+    loop registers.
+    
+    Args:
+        registry (weakref.WeakKeyDictionary): State per event loop
+        factory (Callable[[], Any]): Creates the state of a new loop
+        
+    Returns:
+        Any: State of the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    state = registry.get(loop)
+    if state is None:
+        for closed in [other for other in registry.keys() if other.is_closed()]:
+            del registry[closed]
+        state = registry[loop] = factory()
+    return state
+
+
+def _request_semaphore() -> asyncio.Semaphore:
+    """
+    Return the semaphore limiting concurrent API requests on the running event loop.
+    
+    Returns:
+        asyncio.Semaphore: Semaphore with ATE_OPENAI_CONCURRENCY (default 20) slots
+    """
+    return _loop_state(_SEMAPHORES, lambda: asyncio.Semaphore(_OPENAI_CONCURRENCY))
+
+
+@_RATE_LIMIT_RETRY
+async def _create_completion(client: AsyncOpenAI, **kwargs: Any) -> Any:
+    """
+    Create a chat completion, limiting concurrency and retrying rate limits.
+    
+    At most ATE_OPENAI_CONCURRENCY (default 20) requests run at once per
+    event loop, so large asyncio.gather fan-outs queue here instead of
+    tripping the API rate limit. Requests that still hit it are retried
+    with randomized exponential backoff, up to 6 attempts.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI API client instance
+        **kwargs: Arguments for chat.completions.create
+        
+    Returns:
+        ChatCompletion: The API response
+    """
+    async with _request_semaphore():
+        return await client.chat.completions.create(**kwargs)
+
+
+@_RATE_LIMIT_RETRY
+async def _stream_completion(client: AsyncOpenAI, **kwargs: Any) -> str:
+    """
+    Stream a chat completion and collect its JSON content.
+    
+    Like _create_completion, but the concurrency slot is held until the
+    stream has been read, since the response body is still downloading
+    after create() returns.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI API client instance
+        **kwargs: Arguments for chat.completions.create, without stream
+        
+    Returns:
+        str: Message content up to and including the closing brace
+    """
+    async with _request_semaphore():
+        stream = await client.chat.completions.create(stream=True, **kwargs)
+        return await _read_json_stream(stream)
+
+
+def get_client(api_key: Optional[str] = None, *, async_: bool = False) -> Union[OpenAI, AsyncOpenAI]:
+    """
+    Return an OpenAI client.
+    
+    The blocking client is shared by the whole process: use client=get_client()
+    for every call instead of creating a client per request, so connections
+    and TLS sessions are reused.
+    
+    The async client is not shared. Its connection pool is bound to the event
+    loop that first uses it, and caching it would also keep that loop alive
+    after asyncio.run() returns. Each call builds a new client with
+    make_openai_client (HTTP/2); create it once per event loop and pass it to
+    every call made on that loop.
+    
+    Args:
+        api_key (Optional[str]): OpenAI API key (defaults to OPENAI_API_KEY)
+        async_ (bool): Return a new AsyncOpenAI instead of the shared OpenAI client
+        
+    Returns:
+        Union[OpenAI, AsyncOpenAI]: OpenAI API client instance
+    """
+    if async_:
+        return make_openai_client(api_key)
+    return _shared_client(api_key)
+
+
+@lru_cache(maxsize=2)
+def _shared_client(api_key: Optional[str]) -> OpenAI:
+    """
+    Create the blocking OpenAI client of get_client once per API key.
+    
+    Args:
+        api_key (Optional[str]): OpenAI API key (defaults to OPENAI_API_KEY)
+        
+    Returns:
+        OpenAI: Shared OpenAI API client instance
+    """
+    return OpenAI(api_key=api_key)
+
+
+def _create_completion_sync(client: OpenAI, **kwargs: Any) -> Any:
+    """
+    Create a chat completion on a blocking client.
+    
+    Rate limits and transient errors are retried by the client itself
+    (max_retries, honouring Retry-After), so no retry policy is stacked on top.
     
     Args:
         client (OpenAI): OpenAI API client instance
-        brand (str): Equipment brand name
-        model (str): Equipment model number
-        options (List[str], optional): Equipment options (currently unused)
-        llm_model (str): OpenAI model to use
-        temperature (float): Temperature setting for AI responses
+        **kwargs: Arguments for chat.completions.create
         
     Returns:
-        Dict[str, Any]: Marketplace search results with metadata
+        ChatCompletion: The API response
+    """
+    return client.chat.completions.create(**kwargs)
+
+
+@lru_cache(maxsize=None)
+def _load_token_encoding(llm_model: str) -> "tiktoken.Encoding":
     """
+    Load the tokenizer of a model once.
     
-    # Build the complete marketplace search prompt (simplified for brand + model only)
-    user_prompt = build_complete_marketplace_search_prompt(brand, model, [])
-    
-    # Define the expected schema for complete marketplace search
-    schema = {
-        "name": "complete_marketplace_search_payload",
-        "schema": {
-            "type": "object",
-            "properties": {
-                "search_results": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "brand": {"type": "string"},
-                            "model": {"type": "string"},
-                            "price": {"type": "string"},
-                            "vendor": {"type": "string"},
-                            "web_url": {"type": "string"},
-                            "qty_available": {"type": "string"},
-                            "source": {"type": "string"}
-                        },
-                        "required": ["brand", "model", "price", "vendor", "web_url", "qty_available", "source"]
-                    }
-                },
-                "search_summary": {
-                    "type": "object",
-                    "properties": {
-                        "total_results": {"type": "integer"},
-                        "exact_matches": {"type": "integer"},
-                        "partial_matches": {"type": "integer"},
-                        "price_range": {"type": "string"},
-                        "vendor_count": {"type": "integer"},
-                        "search_quality_score": {"type": "string", "enum": ["high", "medium", "low"]},
-                        "recommendations": {"type": "array", "items": {"type": "string"}},
-                        "search_queries_used": {"type": "array", "items": {"type": "string"}}
-                    },
-                    "required": ["total_results", "exact_matches", "partial_matches", "price_range", "vendor_count", "search_quality_score"]
-                }
-            },
-            "required": ["search_results", "search_summary"]
-        },
-        "strict": True
-    }
+    Failures raise instead of returning a value, so they are not cached and
+    the next call tries again.
     
+    Args:
+        llm_model (str): OpenAI model to use
+        
+    Returns:
+        tiktoken.Encoding: Tokenizer
+    """
     try:
-        # Call OpenAI API for marketplace search simulation
-        completion = client.chat.completions.create(
-            model=llm_model,
-            temperature=temperature,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT_COMPLETE_MARKETPLACE},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
+        encoding_name = tiktoken.encoding_name_for_model(llm_model)
+    except KeyError:
+        encoding_name = "cl100k_base"
+    return tiktoken.get_encoding(encoding_name)
+
+
+def _token_encoding(llm_model: str) -> Optional["tiktoken.Encoding"]:
+    """
+    Get the tokenizer of a model.
+    
+    Args:
+        llm_model (str): OpenAI model to use
         
-        # Parse AI response
-        content = completion.choices[0].message.content or "{}"
-        data = json.loads(content)
-        
-        # Ensure the response has the correct structure
-        if "search_results" not in data:
-            data = {
-                "search_results": [],
-                "search_summary": {
-                    "total_results": 0,
-                    "exact_matches": 0,
-                    "partial_matches": 0,
-                    "price_range": "No results found",
-                    "vendor_count": 0,
-                    "search_quality_score": "low",
-                    "recommendations": ["No search results available"],
-                    "search_queries_used": []
-                }
-            }
+    Returns:
+        Optional[tiktoken.Encoding]: Tokenizer, or None if it cannot be loaded
+            (e.g. the encoding files cannot be downloaded)
+    """
+    try:
+        return _load_token_encoding(llm_model)
+    except Exception as e:
+        print(f"Token counting unavailable, estimating instead: {e}")
+        return None
+
+
+def _count_tokens(text: str, llm_model: str) -> int:
+    """
+    Count the tokens of a prompt, estimating 4 characters per token without tiktoken data.
+    
+    Args:
+        text (str): Prompt text
+        llm_model (str): OpenAI model to use
         
-        return data
+    Returns:
+        int: Number of tokens
+    """
+    encoding = _token_encoding(llm_model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+@lru_cache(maxsize=None)
+def _prompt_budget(llm_model: str, system_prompt: str) -> Optional[int]:
+    """
+    Compute how many tokens the user prompt may use next to a static system prompt.
+    
+    Args:
+        llm_model (str): OpenAI model to use
+        system_prompt (str): System prompt sent with the request
         
-    except Exception as e:
-        print(f"Complete marketplace search error: {e}")
-        # Return empty results on error
-        return {
-            "search_results": [],
-            "search_summary": {
-                "total_results": 0,
-                "exact_matches": 0,
-                "partial_matches": 0,
-                "price_range": "Search failed",
-                "vendor_count": 0,
-                "search_quality_score": "low",
-                "recommendations": [f"Search failed due to error: {e}"],
-                "search_queries_used": []
-            }
-        }
+    Returns:
+        Optional[int]: Token budget, or None if the model's context window is unknown
+    """
+    limit = MODEL_LIMITS.get(llm_model)
+    if limit is None:
+        return None
+    return limit - _RESPONSE_TOKEN_RESERVE - _count_tokens(system_prompt, llm_model)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int, llm_model: str) -> str:
+    """
+    Shorten text to at most max_tokens tokens.
+    
+    Args:
+        text (str): Text to shorten
+        max_tokens (int): Maximum number of tokens to keep
+        llm_model (str): OpenAI model to use
+        
+    Returns:
+        str: The start of the text
+    """
+    max_tokens = max(max_tokens, 0)
+    encoding = _token_encoding(llm_model)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text)[:max_tokens])
 
 
+def _fit_user_prompt(original_text: str, llm_model: str) -> str:
+    """
+    Build the parsing prompt, truncating the text if it would not fit the context window.
+    
+    Args:
+        original_text (str): Raw equipment text to parse
+        llm_model (str): OpenAI model to use
+        
+    Returns:
+        str: User prompt for equipment parsing
+    """
+    user_prompt = build_user_prompt(original_text)
+    budget = _prompt_budget(llm_model, SYSTEM_PROMPT)
+    if budget is not None and _count_tokens(user_prompt, llm_model) > budget:
+        overhead = _count_tokens(build_user_prompt(""), llm_model)
+        user_prompt = build_user_prompt(_truncate_to_tokens(original_text, budget - overhead, llm_model))
+    return user_prompt
+
+
+def _marketplace_prompt_fits(user_prompt: str, llm_model: str) -> bool:
+    """
+    Check whether a marketplace search prompt fits the context window.
+    
+    Args:
+        user_prompt (str): User prompt for the marketplace search
+        llm_model (str): OpenAI model to use
+        
+    Returns:
+        bool: False if the request would certainly be rejected by the API
+    """
+    budget = _prompt_budget(llm_model, SYSTEM_PROMPT_COMPLETE_MARKETPLACE)
+    return budget is None or _count_tokens(user_prompt, llm_model) <= budget
+
+
+def _parse_cache_key(original_text: str, llm_model: str, temperature: float) -> Tuple[str, str, float]:
+    """
+    Build the cache key of a parsing request.
+    
+    Args:
+        original_text (str): Raw equipment text to parse
+        llm_model (str): OpenAI model to use
+        temperature (float): Temperature setting for AI responses
+        
+    Returns:
+        Tuple[str, str, float]: Normalized text, model and temperature
+    """
+    return (original_text.strip().lower(), llm_model, temperature)
+
+
+def _parse_cache_get(key: Tuple[str, str, float]) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached parsing result and mark it as recently used.
+    
+    Args:
+        key (Tuple[str, str, float]): Key built by _parse_cache_key
+        
+    Returns:
+        Optional[Dict[str, Any]]: A copy of the cached result, or None on a miss
+    """
+    with _PARSE_CACHE_LOCK:
+        data = _PARSE_CACHE.get(key)
+        if data is None:
+            return None
+        _PARSE_CACHE.move_to_end(key)
+    # Copy so callers can modify the result without corrupting the cache
+    return copy.deepcopy(data)
+
+
+def _parse_cache_put(key: Tuple[str, str, float], data: Dict[str, Any]) -> None:
+    """
+    Store a parsing result, evicting the least recently used entry when full.
+    
+    Fallback results are not stored, so a failed parse is retried next time.
+    
+    Args:
+        key (Tuple[str, str, float]): Key built by _parse_cache_key
+        data (Dict[str, Any]): Parsing result to cache
+    """
+    if data == _empty_normalized_payload():
+        return
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[key] = copy.deepcopy(data)
+        _PARSE_CACHE.move_to_end(key)
+        if len(_PARSE_CACHE) > _PARSE_CACHE_MAXSIZE:
+            _PARSE_CACHE.popitem(last=False)
+
+
+@lru_cache(maxsize=1)
+def _semantic_model() -> Any:
+    """
+    Load the sentence embedding model of the semantic cache once.
+    
+    Returns:
+        SentenceTransformer: Embedding model, or None if sentence-transformers
+            is not installed or the model cannot be loaded
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    try:
+        return SentenceTransformer(_SEMANTIC_MODEL_NAME)
+    except Exception as e:
+        print(f"Semantic cache disabled: {e}")
+        return None
+
+
+def _parse_matches_text(data: Dict[str, Any], original_text: str) -> bool:
+    """
+    Check that every brand, model and option word of a parsing result occurs in a text.
+    
+    Guards the semantic cache against near-identical queries with different
+    option codes, which embed almost identically.
+    
+    Args:
+        data (Dict[str, Any]): Cached parsing result
+        original_text (str): Raw equipment text being parsed
+        
+    Returns:
+        bool: True if the result can be reused for the text
+    """
+    words = {word.strip(_WORD_PUNCTUATION) for word in re.split(r"[\s/]+", original_text.lower())}
+    normalized = data["normalized"]
+    needed = normalized["brand"].split() + normalized["model"].split() + normalized["options"]
+    return all(word.lower() in words for word in needed)
+
+
+class _SemanticCache:
+    """
+    Fixed-size cache of parsing results looked up by query embedding.
+    
+    Embeddings are normalized, so the dot product with the cached matrix
+    gives cosine similarities. Entries live in a ring buffer, so the oldest
+    one is replaced once the cache is full.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._vectors: Optional["np.ndarray"] = None
+        self._entries: List[Optional[Tuple[str, Dict[str, Any]]]] = [None] * size
+        self._count = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, original_text: str, llm_model: str) -> Tuple[Optional[Dict[str, Any]], Optional["np.ndarray"]]:
+        """
+        Find the cached result of the most similar earlier query.
+        
+        Args:
+            original_text (str): Raw equipment text to parse
+            llm_model (str): OpenAI model to use
+            
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]: A copy of the
+                cached result (or None on a miss) and the query embedding to pass
+                to store (None when the semantic cache is disabled)
+        """
+        model = _semantic_model()
+        if model is None:
+            return None, None
+        vector = model.encode([original_text], normalize_embeddings=True)[0].astype("float32")
+
+        with self._lock:
+            if not self._count:
+                return None, vector
+            similarities = self._vectors[:self._count] @ vector
+            best = int(similarities.argmax())
+            entry_model, data = self._entries[best]
+        if (similarities[best] >= _SEMANTIC_THRESHOLD and entry_model == llm_model
+                and _parse_matches_text(data, original_text)):
+            return copy.deepcopy(data), vector
+        return None, vector
+
+    def store(self, vector: Optional["np.ndarray"], llm_model: str, data: Dict[str, Any]) -> None:
+        """
+        Add a parsing result under the embedding returned by lookup.
+        
+        Args:
+            vector (Optional[np.ndarray]): Query embedding, None when disabled
+            llm_model (str): OpenAI model that produced the result
+            data (Dict[str, Any]): Parsing result to cache
+        """
+        if vector is None or data == _empty_normalized_payload():
+            return
+        with self._lock:
+            if self._vectors is None:
+                import numpy as np
+                self._vectors = np.zeros((self._size, vector.shape[0]), dtype=np.float32)
+            self._vectors[self._next] = vector
+            self._entries[self._next] = (llm_model, copy.deepcopy(data))
+            self._next = (self._next + 1) % self._size
+            self._count = min(self._count + 1, self._size)
+
+
+_SEMANTIC_CACHE = _SemanticCache(_SEMANTIC_CACHE_SIZE)
+
+
+def _local_parse(original_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse equipment text locally, applying the rules of SYSTEM_PROMPT.
+    
+    Brand and model are the first two meaningful words before the options,
+    the first option is the word immediately before the first "/", and the
+    options run up to the next whitespace. Set ATE_DISABLE_LOCAL_PARSE to 1,
+    true or yes to always use the AI instead.
+    
+    Args:
+        original_text (str): Raw equipment text to parse
+        
+    Returns:
+        Optional[Dict[str, Any]]: Parsed equipment data with normalized structure,
+        or None when brand, model or options cannot be determined, e.g. when
+        one of them is punctuation only
+    """
+    if os.environ.get("ATE_DISABLE_LOCAL_PARSE", "").strip().lower() in {"1", "true", "yes"}:
+        return None
+
+    match = _OPT_RE.search(original_text)
+    if match is None:
+        return None
+
+    # Brand and model come from the text before the options
+    words = (word.strip(_WORD_PUNCTUATION) for word in original_text[:match.start()].split())
+    meaningful = [word for word in words if word and word.lower() not in _STOPWORDS]
+
+    options = [match.group(1)] + match.group(2).split("/")
+    options = [opt.strip(_WORD_PUNCTUATION) for opt in options]
+    options = [opt for opt in options if opt]
+
+    # Leave unusual layouts (e.g. model glued to the options) to the AI
+    if len(meaningful) < 2 or not options:
+        return None
+
+    # Brand names like "Rohde & Schwarz" would leave "&" as the model
+    if not all(any(char.isalnum() for char in word) for word in meaningful[:2] + options):
+        return None
+
+    return {
+        "normalized": {
+            "brand": meaningful[0],
+            "model": meaningful[1],
+            "options": options
+        },
+        "results": []
+    }
+
+
+def _normalize_from_cache(
+    original_text: str,
+    llm_model: str,
+    temperature: float,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[str, str, float]]]:
+    """
+    Answer a parse request by local parsing or from the LRU cache.
+    
+    Args:
+        original_text (str): Raw equipment text to parse
+        llm_model (str): OpenAI model to use
+        temperature (float): Temperature setting for AI responses
+        
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[Tuple[str, str, float]]]:
+        Parsed equipment data (None on a miss) and the cache key (None for
+        non-deterministic requests)
+    """
+    # Well-formed queries are parsed locally without calling the API
+    local = _local_parse(original_text)
+    if local is not None:
+        return local, None
+
+    # Serve repeated deterministic requests from the cache
+    cache_key = _parse_cache_key(original_text, llm_model, temperature) if temperature <= 0 else None
+    if cache_key is not None:
+        return _parse_cache_get(cache_key), cache_key
+    return None, None
+
+
+def _normalize_from_semantic_cache(
+    cache_key: Tuple[str, str, float],
+    original_text: str,
+    llm_model: str,
+) -> Tuple[Optional[Dict[str, Any]], Any]:
+    """
+    Answer a parse request from the result of a paraphrase, if one was parsed before.
+    
+    Blocking, since it embeds the text; async callers run it in a thread.
+    
+    Args:
+        cache_key (Tuple[str, str, float]): LRU cache key of the request
+        original_text (str): Raw equipment text to parse
+        llm_model (str): OpenAI model to use
+        
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Any]: Parsed equipment data (None on
+        a miss) and the text embedding to store the new result with
+    """
+    cached, vector = _SEMANTIC_CACHE.lookup(original_text, llm_model)
+    if cached is not None:
+        _parse_cache_put(cache_key, cached)
+    return cached, vector
+
+
+def _normalize_request(original_text: str, llm_model: str, temperature: float) -> Dict[str, Any]:
+    """
+    Build the chat completion arguments of a parse request.
+    
+    Args:
+        original_text (str): Raw equipment text to parse
+        llm_model (str): OpenAI model to use
+        temperature (float): Temperature setting for AI responses
+        
+    Returns:
+        Dict[str, Any]: Arguments for chat.completions.create
+    """
+    # Build user prompt for equipment parsing, truncating oversized text
+    user_prompt = _fit_user_prompt(original_text, llm_model)
+    return {
+        "model": llm_model,
+        "temperature": temperature,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        "response_format": {"type": "json_schema", "json_schema": _NORMALIZED_SCHEMA},
+    }
+
+
+def _normalize_store(
+    completion: Any,
+    cache_key: Optional[Tuple[str, str, float]],
+    vector: Any,
+    llm_model: str,
+) -> Dict[str, Any]:
+    """
+    Parse the response of a parse request and cache the result.
+    
+    Args:
+        completion (ChatCompletion): The API response
+        cache_key (Optional[Tuple[str, str, float]]): LRU cache key, None if the
+            result is not cached
+        vector (Any): Text embedding for the semantic cache, if any
+        llm_model (str): OpenAI model used
+        
+    Returns:
+        Dict[str, Any]: Parsed equipment data with normalized structure
+    """
+    # Extract and parse AI response
+    data = _parse_normalized_content(completion.choices[0].message.content or "")
+    if cache_key is not None:
+        _parse_cache_put(cache_key, data)
+        _SEMANTIC_CACHE.store(vector, llm_model, data)
+    return data
+
+
+async def normalize_options_via_llm(
+    client: AsyncOpenAI,
+    original_text: str,
+    llm_model: str,
+    temperature: float,
+) -> Dict[str, Any]:
+    """
+    Use AI to normalize and parse equipment options from text.
+    
+    This function sends equipment text to OpenAI's language model to extract
+    structured information including brand, model, and options. It handles
+    JSON parsing and provides fallback responses for error cases.
+    
+    The coroutine does not block while waiting for the API, so many texts can
+    be parsed concurrently over one client from make_openai_client:
+    
+        tasks = [normalize_options_via_llm(client, t, llm_model, 0.0) for t in texts]
+        payloads = await asyncio.gather(*tasks)
+    
+    Well-formed queries are parsed locally by _local_parse without calling
+    the API. Deterministic requests (temperature 0) are answered from an
+    in-process LRU cache when the same text was parsed before, and, with
+    sentence-transformers installed, from a semantic cache when a paraphrase
+    of it was.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI API client instance, e.g. get_client(async_=True)
+        original_text (str): Raw equipment text to parse
+        llm_model (str): OpenAI model to use (e.g., "gpt-4o")
+        temperature (float): Temperature setting for AI responses
+        
+    Returns:
+        Dict[str, Any]: Parsed equipment data with normalized structure
+    """
+    # Local parsing and the LRU cache answer without calling the API
+    data, cache_key = _normalize_from_cache(original_text, llm_model, temperature)
+    if data is not None:
+        return data
+
+    # Reuse the result of a paraphrase of this text, if one was parsed before
+    vector = None
+    if cache_key is not None:
+        data, vector = await asyncio.to_thread(_normalize_from_semantic_cache, cache_key, original_text, llm_model)
+        if data is not None:
+            return data
+
+    completion = await _create_completion(client, **_normalize_request(original_text, llm_model, temperature))
+    return _normalize_store(completion, cache_key, vector, llm_model)
+
+
+def normalize_options_via_llm_sync(
+    client: OpenAI,
+    original_text: str,
+    llm_model: str,
+    temperature: float,
+) -> Dict[str, Any]:
+    """
+    Blocking variant of normalize_options_via_llm for synchronous callers.
+    
+    Uses the same local parsing, prompt, response handling and caching,
+    with a synchronous OpenAI client.
+    
+    Args:
+        client (OpenAI): OpenAI API client instance, e.g. get_client()
+        original_text (str): Raw equipment text to parse
+        llm_model (str): OpenAI model to use (e.g., "gpt-4o")
+        temperature (float): Temperature setting for AI responses
+        
+    Returns:
+        Dict[str, Any]: Parsed equipment data with normalized structure
+    """
+    # Local parsing and the LRU cache answer without calling the API
+    data, cache_key = _normalize_from_cache(original_text, llm_model, temperature)
+    if data is not None:
+        return data
+
+    # Reuse the result of a paraphrase of this text, if one was parsed before
+    vector = None
+    if cache_key is not None:
+        data, vector = _normalize_from_semantic_cache(cache_key, original_text, llm_model)
+        if data is not None:
+            return data
+
+    completion = _create_completion_sync(client, **_normalize_request(original_text, llm_model, temperature))
+    return _normalize_store(completion, cache_key, vector, llm_model)
+
+
+async def normalize_options_via_llm_batch(
+    client: AsyncOpenAI,
+    texts: List[str],
+    llm_model: str,
+    temperature: float,
+) -> List[Dict[str, Any]]:
+    """
+    Use AI to parse several equipment texts with a single request.
+    
+    Texts handled by local parsing or the cache are answered directly; the
+    remaining ones are sent together, so the system prompt and the request
+    round-trip are paid once. Entries missing from the batched response are
+    parsed individually with normalize_options_via_llm.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI API client instance, e.g. get_client(async_=True)
+        texts (List[str]): Raw equipment texts to parse
+        llm_model (str): OpenAI model to use (e.g., "gpt-4o")
+        temperature (float): Temperature setting for AI responses
+        
+    Returns:
+        List[Dict[str, Any]]: Parsed equipment data for each text, in input order
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+    pending = []
+    for i, text in enumerate(texts):
+        results[i] = _local_parse(text)
+        if results[i] is None and temperature <= 0:
+            results[i] = _parse_cache_get(_parse_cache_key(text, llm_model, temperature))
+        if results[i] is None:
+            pending.append(i)
+
+    # A single text does not need the batch prompt, and a batch too large
+    # for the context window is parsed one text at a time
+    if len(pending) > 1:
+        batch_prompt = build_batch_user_prompt([texts[i] for i in pending])
+        budget = _prompt_budget(llm_model, SYSTEM_PROMPT)
+        if budget is None or _count_tokens(batch_prompt, llm_model) <= budget:
+            completion = await _create_completion(
+                client,
+                model=llm_model,
+                temperature=temperature,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": batch_prompt},
+                ],
+                response_format={"type": "json_schema", "json_schema": _BATCH_SCHEMA},
+            )
+            try:
+                batch = _json.loads(completion.choices[0].message.content or "")["batch"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                batch = None
+
+            # Results can only be matched to texts by position
+            if isinstance(batch, list) and len(batch) == len(pending):
+                for i, item in zip(pending, batch):
+                    if isinstance(item, dict) and isinstance(item.get("normalized"), dict):
+                        results[i] = item
+                        if temperature <= 0:
+                            _parse_cache_put(_parse_cache_key(texts[i], llm_model, temperature), item)
+
+    # Parse anything the batch did not answer one text at a time
+    missing = [i for i in pending if results[i] is None]
+    if missing:
+        singles = await asyncio.gather(
+            *(normalize_options_via_llm(client, texts[i], llm_model, temperature) for i in missing)
+        )
+        for i, data in zip(missing, singles):
+            results[i] = data
+
+    return results
+
+
+class _ParseBatcher:
+    """
+    Gather concurrent parse requests into normalize_options_via_llm_batch calls.
+    
+    Requests arriving within a short window of each other are sent as one
+    batch. The queue and worker task only exist while requests are pending,
+    so an idle batcher holds no reference to its event loop.
+    """
+
+    def __init__(self, client: AsyncOpenAI, llm_model: str, temperature: float):
+        self._client = client
+        self._llm_model = llm_model
+        self._temperature = temperature
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def parse(self, original_text: str) -> Dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run(self._queue))
+        self._queue.put_nowait((original_text, future))
+        return await future
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while not queue.empty():
+            items = [queue.get_nowait()]
+            deadline = loop.time() + _AUTO_BATCH_WINDOW
+            while len(items) < _AUTO_BATCH_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                payloads = await normalize_options_via_llm_batch(
+                    self._client, [text for text, _ in items], self._llm_model, self._temperature
+                )
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), payload in zip(items, payloads):
+                    if not future.done():
+                        future.set_result(payload)
+
+        # No await since the empty check, so no request can be left behind
+        self._queue = None
+        self._worker = None
+
+
+# Auto-batchers per event loop, dropped once their loop is closed
+_BATCHERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[int, str, float], _ParseBatcher]]" = weakref.WeakKeyDictionary()
+
+
+async def _auto_batch(
+    client: AsyncOpenAI,
+    original_text: str,
+    llm_model: str,
+    temperature: float,
+) -> Dict[str, Any]:
+    """
+    Parse one text, batching it with other concurrent calls for the same client.
+    
+    Calls made within 50 ms of each other (e.g. from asyncio.gather) share a
+    single normalize_options_via_llm_batch request.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI API client instance, e.g. get_client(async_=True)
+        original_text (str): Raw equipment text to parse
+        llm_model (str): OpenAI model to use (e.g., "gpt-4o")
+        temperature (float): Temperature setting for AI responses
+        
+    Returns:
+        Dict[str, Any]: Parsed equipment data with normalized structure
+    """
+    batchers = _loop_state(_BATCHERS, dict)
+    key = (id(client), llm_model, temperature)
+    batcher = batchers.get(key)
+    if batcher is None or batcher._client is not client:
+        batcher = batchers[key] = _ParseBatcher(client, llm_model, temperature)
+    return await batcher.parse(original_text)
+
+
+def _marketplace_cache() -> diskcache.Cache:
+    """
+    Open the marketplace search cache on first use.
+    
+    Returns:
+        diskcache.Cache: SQLite-backed cache, safe to share between processes
+    """
+    global _marketplace_cache_instance
+    if _marketplace_cache_instance is None:
+        _marketplace_cache_instance = diskcache.Cache(
+            _MARKETPLACE_CACHE_DIR, size_limit=_MARKETPLACE_CACHE_SIZE_LIMIT
+        )
+    return _marketplace_cache_instance
+
+
+def _marketplace_cache_key(brand: str, model: str, llm_model: str) -> str:
+    """
+    Build the cache key of a marketplace search.
+    
+    Args:
+        brand (str): Equipment brand name
+        model (str): Equipment model number
+        llm_model (str): OpenAI model to use
+        
+    Returns:
+        str: Case-insensitive key for the search
+    """
+    return f"{brand.lower()}|{model.lower()}|{llm_model}"
+
+
+class _JsonObjectScanner:
+    """
+    Find where the top-level JSON object of a streamed response ends.
+    
+    Braces are counted outside of string literals, so text is fed piece by
+    piece as it arrives.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> int:
+        """
+        Scan the next piece of the response.
+        
+        Args:
+            text (str): Next piece of streamed content
+            
+        Returns:
+            int: Index just past the closing brace in text, or -1 if the
+                object is not complete yet
+        """
+        for i, char in enumerate(text):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    return i + 1
+        return -1
+
+
+async def _read_json_stream(stream: Any) -> str:
+    """
+    Collect a streamed chat completion up to the end of its JSON object.
+    
+    The stream is closed as soon as the top-level object is complete, so no
+    time is spent waiting for trailing tokens.
+    
+    Args:
+        stream (AsyncStream): Streamed chat completion
+        
+    Returns:
+        str: Message content up to and including the closing brace
+    """
+    buffer = io.StringIO()
+    scanner = _JsonObjectScanner()
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            piece = chunk.choices[0].delta.content or ""
+            end = scanner.feed(piece)
+            if end >= 0:
+                buffer.write(piece[:end])
+                break
+            buffer.write(piece)
+    finally:
+        await stream.close()
+    return buffer.getvalue()
+
+
+def _read_json_stream_sync(stream: Any) -> str:
+    """
+    Blocking variant of _read_json_stream for synchronous streams.
+    
+    Args:
+        stream (Stream): Streamed chat completion
+        
+    Returns:
+        str: Message content up to and including the closing brace
+    """
+    buffer = io.StringIO()
+    scanner = _JsonObjectScanner()
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            piece = chunk.choices[0].delta.content or ""
+            end = scanner.feed(piece)
+            if end >= 0:
+                buffer.write(piece[:end])
+                break
+            buffer.write(piece)
+    finally:
+        stream.close()
+    return buffer.getvalue()
+
+
+async def _search_one(
+    client: AsyncOpenAI,
+    brand: str,
+    model: str,
+    variant: str,
+    llm_model: str,
+    temperature: float,
+) -> List[Dict[str, Any]]:
+    """
+    Run one query variant of a marketplace search.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI API client instance
+        brand (str): Equipment brand name
+        model (str): Equipment model number
+        variant (str): Query suffix from _SEARCH_VARIANTS
+        llm_model (str): OpenAI model to use
+        temperature (float): Temperature setting for AI responses
+        
+    Returns:
+        List[Dict[str, Any]]: Listings found by the query
+    """
+    query = f"{brand} {model} {variant}".strip()
+    content = await _stream_completion(
+        client,
+        model=llm_model,
+        temperature=temperature,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT_COMPLETE_MARKETPLACE},
+            {"role": "user", "content": _SEARCH_VARIANT_TPL % (brand, model, query)},
+        ],
+        response_format={"type": "json_schema", "json_schema": _SEARCH_RESULTS_SCHEMA},
+    )
+    return _json.loads(content)["search_results"]
+
+
+def _search_one_sync(
+    client: OpenAI,
+    brand: str,
+    model: str,
+    variant: str,
+    llm_model: str,
+    temperature: float,
+) -> List[Dict[str, Any]]:
+    """
+    Blocking variant of _search_one for synchronous callers.
+    
+    Args:
+        client (OpenAI): OpenAI API client instance
+        brand (str): Equipment brand name
+        model (str): Equipment model number
+        variant (str): Query suffix from _SEARCH_VARIANTS
+        llm_model (str): OpenAI model to use
+        temperature (float): Temperature setting for AI responses
+        
+    Returns:
+        List[Dict[str, Any]]: Listings found by the query
+    """
+    query = f"{brand} {model} {variant}".strip()
+    stream = _create_completion_sync(
+        client,
+        model=llm_model,
+        temperature=temperature,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT_COMPLETE_MARKETPLACE},
+            {"role": "user", "content": _SEARCH_VARIANT_TPL % (brand, model, query)},
+        ],
+        response_format={"type": "json_schema", "json_schema": _SEARCH_RESULTS_SCHEMA},
+        stream=True,
+    )
+    return _json.loads(_read_json_stream_sync(stream))["search_results"]
+
+
+def _parse_price(price: str) -> Optional[Tuple[str, float]]:
+    """
+    Read the currency and amount of a listed price.
+    
+    Both "1,234.56" and "1.234,56" are read as 1234.56; a single separator
+    followed by exactly three digits is taken as a thousands separator.
+    
+    Args:
+        price (str): Price as listed, e.g. "$1,234.56" or "\u20ac1.234,56"
+        
+    Returns:
+        Optional[Tuple[str, float]]: Currency code ("" if not stated) and
+        amount, or None if the price has no number
+    """
+    match = _PRICE_RE.search(price)
+    if not match:
+        return None
+    number = match.group()
+    if "," in number and "." in number:
+        decimal = "," if number.rfind(",") > number.rfind(".") else "."
+    else:
+        separator = "," if "," in number else "."
+        groups = number.split(separator)
+        decimal = separator if len(groups) == 2 and len(groups[1]) != 3 else None
+    thousands = {",": ".", ".": ","}.get(decimal, ",.")
+    for char in thousands:
+        number = number.replace(char, "")
+    if decimal:
+        number = number.replace(decimal, ".")
+    currency = _CURRENCY_RE.search(price)
+    code = currency.group() if currency else ""
+    return _CURRENCY_CODES.get(code, code), float(number)
+
+
+def _is_exact_match(item: Dict[str, Any], brand: str, model: str) -> bool:
+    """
+    Check whether a listing is for the searched equipment.
+    
+    The model numbers must be equal, ignoring case, spaces and hyphens, and
+    the brands must share a token, so a "Keysight" listing matches a search
+    for "Agilent HP Keysight".
+    
+    Args:
+        item (Dict[str, Any]): Listing from the search results
+        brand (str): Equipment brand name
+        model (str): Equipment model number
+        
+    Returns:
+        bool: True if the listing is for the searched brand and model
+    """
+    def compact(text: str) -> str:
+        return "".join(_BRAND_TOKEN_RE.findall(text.lower()))
+    
+    if not model or compact(item.get("model", "")) != compact(model):
+        return False
+    brand_tokens = set(_BRAND_TOKEN_RE.findall(brand.lower()))
+    return bool(brand_tokens & set(_BRAND_TOKEN_RE.findall(item.get("brand", "").lower())))
+
+
+def _merge_search_results(brand: str, model: str, queries: List[str], batches: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Merge the listings of several search queries and summarize them.
+    
+    Listings are deduplicated by URL, and the summary is computed here
+    instead of being requested from the model.
+    
+    Args:
+        brand (str): Equipment brand name
+        model (str): Equipment model number
+        queries (List[str]): Search queries that were run
+        batches (List[List[Dict[str, Any]]]): Listings found by each successful query
+        
+    Returns:
+        Dict[str, Any]: Marketplace search results with metadata
+    """
+    results = []
+    seen_urls = set()
+    for batch in batches:
+        for item in batch:
+            url = item.get("web_url", "").strip()
+            if url and url in seen_urls:
+                continue
+            seen_urls.add(url)
+            results.append(item)
+
+    exact = sum(1 for item in results if _is_exact_match(item, brand, model))
+
+    # Range of the listed prices per currency, shown as the original price strings
+    priced: Dict[str, List[Tuple[float, str]]] = {}
+    for item in results:
+        parsed = _parse_price(item.get("price", ""))
+        if parsed:
+            currency, amount = parsed
+            priced.setdefault(currency, []).append((amount, item["price"]))
+    ranges = []
+    for prices in priced.values():
+        low, high = min(prices), max(prices)
+        ranges.append(low[1] if low[0] == high[0] else f"{low[1]} - {high[1]}")
+    price_range = "; ".join(ranges) or "Price not available"
+
+    if exact >= 3:
+        quality = "high"
+    elif exact >= 1:
+        quality = "medium"
+    else:
+        quality = "low"
+
+    recommendations = [] if results else ["No listings found; try searching for the model number alone"]
+    return {
+        "search_results": results,
+        "search_summary": {
+            "total_results": len(results),
+            "exact_matches": exact,
+            "partial_matches": len(results) - exact,
+            "price_range": price_range,
+            "vendor_count": len({item.get("vendor", "").lower() for item in results if item.get("vendor")}),
+            "search_quality_score": quality,
+            "recommendations": recommendations,
+            "search_queries_used": queries
+        }
+    }
+
+
+def _is_weak_marketplace_result(data: Dict[str, Any]) -> bool:
+    """
+    Check whether a marketplace search result is worth repeating with a stronger model.
+    
+    Args:
+        data (Dict[str, Any]): Marketplace search results with metadata
+        
+    Returns:
+        bool: True if there are no results or the search quality is low
+    """
+    summary = data.get("search_summary") or {}
+    return not data.get("search_results") or summary.get("search_quality_score") == "low"
+
+
+def _marketplace_search_start(
+    brand: str,
+    model: str,
+    llm_model: str,
+    force_refresh: bool,
+) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Do the steps of a marketplace search that come before the API requests.
+    
+    Args:
+        brand (str): Equipment brand name
+        model (str): Equipment model number
+        llm_model (str): OpenAI model to use
+        force_refresh (bool): Ignore cached results and search again
+        
+    Returns:
+        Tuple[Optional[Dict[str, Any]], bool]: Cached results (None if the
+        search has to run) and whether they are final, i.e. a recent failure
+        or a skipped search that must be returned as is
+    """
+    # Serve recent searches for the same equipment from the disk cache
+    cache_key = _marketplace_cache_key(brand, model, llm_model)
+    data = None if force_refresh else _marketplace_cache().get(cache_key)
+    if data is not None and data.get("_failed"):
+        # The same search failed moments ago; don't call the API again yet
+        return data["data"], True
+    
+    if data is None:
+        # Check the size of the compact per-query prompt (simplified for brand + model only)
+        user_prompt = _SEARCH_VARIANT_TPL % (brand, model, f"{brand} {model}")
+        if not _marketplace_prompt_fits(user_prompt, llm_model):
+            return _empty_marketplace_result("Search skipped", "Brand and model are too long to search"), True
+    
+    return data, False
+
+
+def _marketplace_search_finish(
+    brand: str,
+    model: str,
+    llm_model: str,
+    batches: List[Union[List[Dict[str, Any]], BaseException]],
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Merge the listings found by each query variant and cache the outcome.
+    
+    Failed variants are skipped. When every variant failed, the failure is
+    cached for _MARKETPLACE_FAILURE_TTL seconds.
+    
+    Args:
+        brand (str): Equipment brand name
+        model (str): Equipment model number
+        llm_model (str): OpenAI model used
+        batches (List[Union[List[Dict[str, Any]], BaseException]]): Listings
+            or exception of each variant in _SEARCH_VARIANTS
+        
+    Returns:
+        Tuple[Dict[str, Any], bool]: Marketplace search results with metadata,
+        and whether the search failed
+    """
+    cache_key = _marketplace_cache_key(brand, model, llm_model)
+    try:
+        found = [batch for batch in batches if not isinstance(batch, BaseException)]
+        if not found:
+            raise batches[0]
+        
+        # Merge the listings and keep them for later searches
+        queries = [f"{brand} {model} {variant}".strip() for variant in _SEARCH_VARIANTS]
+        data = _merge_search_results(brand, model, queries, found)
+        _marketplace_cache().set(cache_key, data, expire=_MARKETPLACE_CACHE_TTL)
+        return data, False
+        
+    except Exception as e:
+        print(f"Complete marketplace search error: {e}")
+        # Return empty results on error, remembering the failure briefly
+        data = _empty_marketplace_result("Search failed", f"Search failed due to error: {e}")
+        _marketplace_cache().set(cache_key, {"_failed": True, "data": data}, expire=_MARKETPLACE_FAILURE_TTL)
+        return data, True
+
+
+def _escalation_model(llm_model: str, data: Dict[str, Any]) -> Optional[str]:
+    """
+    Pick the model to repeat a weak marketplace search with.
+    
+    Args:
+        llm_model (str): OpenAI model that was used
+        data (Dict[str, Any]): Marketplace search results with metadata
+        
+    Returns:
+        Optional[str]: Stronger model from _ESCALATE_MODEL_MAP, or None to keep the results
+    """
+    stronger_model = _ESCALATE_MODEL_MAP.get(llm_model)
+    if stronger_model and _is_weak_marketplace_result(data):
+        print(f"Complete marketplace search: weak results from {llm_model}, escalating to {stronger_model}")
+        return stronger_model
+    return None
+
+
+def _pick_escalated_result(first: Dict[str, Any], escalated: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Choose between the results of a weak search and of its escalated repeat.
+    
+    Args:
+        first (Dict[str, Any]): Results of the weaker model
+        escalated (Dict[str, Any]): Results of the stronger model
+        
+    Returns:
+        Dict[str, Any]: The escalated results, or the first ones when the
+        escalated search failed or found nothing
+    """
+    if escalated.get("search_results") or not first.get("search_results"):
+        return escalated
+    return first
+
+
+async def complete_marketplace_search_via_llm(
+    client: AsyncOpenAI,
+    brand: str,
+    model: str,
+    options: List[str] = None,
+    llm_model: str = "gpt-4o-mini",
+    temperature: float = 0.0,
+    force_refresh: bool = False
+) -> Dict[str, Any]:
+    """
+    Use LLM to search the COMPLETE marketplace without any limitations.
+    
+    This function simulates comprehensive marketplace search using AI,
+    though it's currently not used in the main application. It provides
+    a framework for AI-powered market research. Searches for several
+    equipment entries can run concurrently with asyncio.gather.
+    
+    Successful results are cached on disk for 6 hours per brand, model and
+    LLM model. Failures are cached for 60 seconds, so an outage does not
+    turn every request into another failing API call.
+    
+    Each query variant in _SEARCH_VARIANTS is searched with its own short
+    request, all in parallel. The listings are deduplicated by URL and
+    summarized locally. Responses are streamed and each stream closed as
+    soon as its JSON object is complete.
+    
+    Searches start on a cheap model; when it finds nothing or no listing
+    matching the exact brand and model (quality "low", computed locally by
+    _merge_search_results), the search is repeated with the next model in
+    _ESCALATE_MODEL_MAP. If that search fails or finds nothing, the first
+    results are kept.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI API client instance, e.g. get_client(async_=True)
+        brand (str): Equipment brand name
+        model (str): Equipment model number
+        options (List[str], optional): Equipment options (currently unused)
+        llm_model (str): OpenAI model to try first
+        temperature (float): Temperature setting for AI responses
+        force_refresh (bool): Ignore cached results and search again
+        
+    Returns:
+        Dict[str, Any]: Marketplace search results with metadata
+    """
+    data, final = _marketplace_search_start(brand, model, llm_model, force_refresh)
+    if final:
+        return data
+    
+    if data is None:
+        # Run every query variant in parallel
+        batches = await asyncio.gather(
+            *(_search_one(client, brand, model, variant, llm_model, temperature) for variant in _SEARCH_VARIANTS),
+            return_exceptions=True,
+        )
+        data, failed = _marketplace_search_finish(brand, model, llm_model, batches)
+        if failed:
+            return data
+    
+    # Repeat weak searches with a stronger model
+    stronger_model = _escalation_model(llm_model, data)
+    if stronger_model:
+        escalated = await complete_marketplace_search_via_llm(
+            client, brand, model, options, stronger_model, temperature, force_refresh
+        )
+        return _pick_escalated_result(data, escalated)
+    
+    return data
+
+
+def complete_marketplace_search_via_llm_sync(
+    client: OpenAI,
+    brand: str,
+    model: str,
+    options: List[str] = None,
+    llm_model: str = "gpt-4o-mini",
+    temperature: float = 0.0,
+    force_refresh: bool = False
+) -> Dict[str, Any]:
+    """
+    Blocking variant of complete_marketplace_search_via_llm for synchronous callers.
+    
+    Runs the same per-variant searches, in parallel threads, so both variants
+    store the same results under the same cache key.
+    
+    Args:
+        client (OpenAI): OpenAI API client instance, e.g. get_client()
+        brand (str): Equipment brand name
+        model (str): Equipment model number
+        options (List[str], optional): Equipment options (currently unused)
+        llm_model (str): OpenAI model to try first
+        temperature (float): Temperature setting for AI responses
+        force_refresh (bool): Ignore cached results and search again
+        
+    Returns:
+        Dict[str, Any]: Marketplace search results with metadata
+    """
+    data, final = _marketplace_search_start(brand, model, llm_model, force_refresh)
+    if final:
+        return data
+    
+    if data is None:
+        # Run every query variant in parallel threads
+        with ThreadPoolExecutor(max_workers=len(_SEARCH_VARIANTS)) as executor:
+            futures = [
+                executor.submit(_search_one_sync, client, brand, model, variant, llm_model, temperature)
+                for variant in _SEARCH_VARIANTS
+            ]
+        batches = [future.exception() or future.result() for future in futures]
+        data, failed = _marketplace_search_finish(brand, model, llm_model, batches)
+        if failed:
+            return data
+    
+    # Repeat weak searches with a stronger model
+    stronger_model = _escalation_model(llm_model, data)
+    if stronger_model:
+        escalated = complete_marketplace_search_via_llm_sync(
+            client, brand, model, options, stronger_model, temperature, force_refresh
+        )
+        return _pick_escalated_result(data, escalated)
+    
+    return data